@@ -0,0 +1,23 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from archive.store import archive_before
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты и комментарии в архивную базу.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.ARCHIVE_AFTER_DAYS,
+            help='Архивировать посты старше этого числа дней.'
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        horizon = timezone.now() - timedelta(days=options['days'])
+        moved = archive_before(horizon, options['batch_size'])
+        self.stdout.write(f'{moved} posts archived')
@@ -0,0 +1,41 @@
+# Generated by Django 2.2.28 on 2026-10-19 16:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('post_id', models.IntegerField(db_index=True)),
+                ('author_id', models.IntegerField()),
+                ('text', models.TextField()),
+                ('created', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['-created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedPost',
+            fields=[
+                ('id', models.IntegerField(primary_key=True, serialize=False)),
+                ('text', models.TextField()),
+                ('pub_date', models.DateTimeField(db_index=True)),
+                ('author_id', models.IntegerField(db_index=True)),
+                ('group_id', models.IntegerField(blank=True, null=True)),
+                ('image', models.CharField(blank=True, max_length=100, null=True)),
+            ],
+            options={
+                'ordering': ['-pub_date'],
+            },
+        ),
+    ]
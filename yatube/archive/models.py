@@ -0,0 +1,32 @@
+from django.db import models
+
+
+class ArchivedPost(models.Model):
+    """
+    Копия старого Post в отдельной базе archive.
+
+    Связи хранятся как простые id: пользователи и группы остаются
+    в основной базе, а внешние ключи между базами SQLite не проверит.
+    """
+
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField(db_index=True)
+    author_id = models.IntegerField(db_index=True)
+    group_id = models.IntegerField(blank=True, null=True)
+    image = models.CharField(max_length=100, blank=True, null=True)
+    views = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-pub_date']
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post_id = models.IntegerField(db_index=True)
+    author_id = models.IntegerField()
+    text = models.TextField()
+    created = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created']
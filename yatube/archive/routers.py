@@ -0,0 +1,22 @@
+ARCHIVE_DB = 'archive'
+
+
+class ArchiveRouter:
+    """Модели приложения archive живут только в базе archive."""
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == 'archive':
+            return ARCHIVE_DB
+        return None
+
+    db_for_write = db_for_read
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if app_label == 'archive':
+            return db == ARCHIVE_DB
+        if db == ARCHIVE_DB:
+            return False
+        return None
@@ -0,0 +1,109 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import F
+
+from posts.models import Comment, ImageBlob, Post, User
+
+from .models import ArchivedComment, ArchivedPost
+from .routers import ARCHIVE_DB
+
+
+def archive_before(horizon, batch_size=500):
+    """
+    Переносит посты старше horizon с комментариями в базу archive.
+
+    Пачка сначала записывается в архив, затем удаляется из горячих
+    таблиц. Архивная копия держит ссылку на картинку, поэтому счётчик
+    ImageBlob увеличивается до удаления поста.
+    """
+    moved = 0
+    candidates = Post.all_objects.filter(
+        pub_date__lt=horizon, is_deleted=False
+    ).order_by('pub_date')
+    while True:
+        posts = list(candidates[:batch_size])
+        if not posts:
+            return moved
+        ids = [post.pk for post in posts]
+        comments = list(Comment.all_objects.filter(
+            post_id__in=ids, is_deleted=False
+        ))
+        with transaction.atomic(using=ARCHIVE_DB):
+            # Прошлый запуск мог записать пачку в архив и упасть до
+            # удаления из горячих таблиц: такие строки уже есть.
+            archived = set(ArchivedPost.objects.filter(
+                pk__in=ids
+            ).values_list('pk', flat=True))
+            archived_comments = set(ArchivedComment.objects.filter(
+                pk__in=[comment.pk for comment in comments]
+            ).values_list('pk', flat=True))
+            ArchivedPost.objects.bulk_create([
+                ArchivedPost(
+                    id=post.pk,
+                    text=post.text,
+                    pub_date=post.pub_date,
+                    author_id=post.author_id,
+                    group_id=post.group_id,
+                    image=post.image.name or None,
+                    views=post.views,
+                )
+                for post in posts if post.pk not in archived
+            ])
+            ArchivedComment.objects.bulk_create([
+                ArchivedComment(
+                    id=comment.pk,
+                    post_id=comment.post_id,
+                    author_id=comment.author_id,
+                    text=comment.text,
+                    created=comment.created,
+                )
+                for comment in comments
+                if comment.pk not in archived_comments
+            ])
+        with transaction.atomic():
+            images = [post.image.name for post in posts if post.image]
+            for name, count in Counter(images).items():
+                ImageBlob.objects.filter(name=name).update(
+                    refs=F('refs') + count
+                )
+            Post.all_objects.filter(pk__in=ids).delete()
+        moved += len(posts)
+
+
+def get_archived_post(post_id, username):
+    """
+    Восстанавливает архивный пост как несохранённый Post, чтобы
+    post_view и шаблоны работали с ним как с обычным.
+    """
+    archived = ArchivedPost.objects.filter(pk=post_id).first()
+    if archived is None:
+        return None, []
+    author = User.objects.filter(
+        pk=archived.author_id, username=username
+    ).first()
+    if author is None:
+        return None, []
+    post = Post(
+        id=archived.id,
+        text=archived.text,
+        pub_date=archived.pub_date,
+        author=author,
+        group_id=archived.group_id,
+        image=archived.image,
+        views=archived.views,
+    )
+    comments = list(ArchivedComment.objects.filter(post_id=archived.id))
+    authors = User.objects.in_bulk({c.author_id for c in comments})
+    restored = []
+    for item in comments:
+        if item.author_id in authors:
+            restored.append(Comment(
+                id=item.id,
+                post=post,
+                author=authors[item.author_id],
+                text=item.text,
+                created=item.created,
+            ))
+    post.comments_count = len(restored)
+    return post, restored
@@ -0,0 +1,58 @@
+from datetime import timedelta
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from archive.models import ArchivedComment, ArchivedPost
+from posts.models import Comment, Post, User
+
+
+class ArchiveTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+        self.reader = User.objects.create_user(username='Uri')
+        self.client = Client()
+        self.old = Post.objects.create(text='Old post', author=self.user)
+        Post.objects.filter(pk=self.old.pk).update(
+            pub_date=timezone.now() - timedelta(days=400)
+        )
+        Comment.objects.create(post=self.old, author=self.reader,
+                               text='Old comment')
+        self.fresh = Post.objects.create(text='Fresh post', author=self.user)
+
+    def test_old_posts_moved_to_archive(self):
+        call_command('archive_posts', days=365, batch_size=1)
+        self.assertEqual(list(Post.all_objects.all()), [self.fresh])
+        self.assertFalse(Comment.all_objects.exists())
+        self.assertEqual(ArchivedPost.objects.get().text, 'Old post')
+        self.assertEqual(ArchivedComment.objects.get().post_id, self.old.pk)
+
+    def test_rerun_after_partial_batch(self):
+        """Пост уже в архиве, но не удалён: повтор не падает."""
+        ArchivedPost.objects.create(
+            id=self.old.pk, text='Old post', pub_date=self.old.pub_date,
+            author_id=self.user.pk
+        )
+        call_command('archive_posts', days=365)
+        self.assertEqual(list(Post.all_objects.all()), [self.fresh])
+        self.assertEqual(ArchivedPost.objects.count(), 1)
+        self.assertEqual(ArchivedComment.objects.count(), 1)
+
+    def test_archived_post_still_served(self):
+        """Старый пост открывается по прежнему адресу с комментариями."""
+        call_command('archive_posts', days=365)
+        url = reverse('post', args=[self.user.username, self.old.pk])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # Страница записи потоковая: тело читается один раз.
+        content = b''.join(response.streaming_content).decode()
+        self.assertIn('Old post', content)
+        self.assertIn('Old comment', content)
+        response = self.client.get(
+            reverse('post', args=[self.reader.username, self.old.pk])
+        )
+        self.assertEqual(response.status_code, 404)
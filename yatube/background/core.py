@@ -0,0 +1,191 @@
+import json
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from collections import defaultdict, deque
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Task
+from .signals import task_finished, task_started
+
+logger = logging.getLogger(__name__)
+
+registry = {}
+# Очередь режима memory: (имя, аргументы).
+memory_queue = deque()
+
+
+class TaskFunction:
+    """Зарегистрированная задача: вызывается напрямую или через delay()."""
+
+    def __init__(self, func, name, batch, max_attempts):
+        self.func = func
+        self.name = name
+        self.batch = batch
+        self.max_attempts = max_attempts
+        self.__doc__ = func.__doc__
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    def delay(self, **kwargs):
+        return enqueue(self.name, **kwargs)
+
+    def run(self, payloads):
+        if self.batch:
+            self.func(payloads)
+        else:
+            for kwargs in payloads:
+                self.func(**kwargs)
+
+
+def task(name=None, batch=False, max_attempts=5):
+    """
+    Регистрирует функцию как фоновую задачу.
+
+    С batch=True функция получает список аргументов всех задач этого
+    типа, взятых воркером за один раз.
+    """
+    def decorator(func):
+        task_name = name or f'{func.__module__}.{func.__name__}'
+        registry[task_name] = TaskFunction(
+            func, task_name, batch, max_attempts
+        )
+        return registry[task_name]
+    return decorator
+
+
+def mode():
+    return getattr(settings, 'BACKGROUND_TASKS', 'db')
+
+
+def enqueue(name, **kwargs):
+    """Ставит задачу в очередь; аргументы должны сериализоваться в JSON."""
+    if name not in registry:
+        raise KeyError(f'Unknown task {name!r}')
+    current = mode()
+    if current == 'eager':
+        registry[name].run([kwargs])
+        return None
+    payload = json.dumps(kwargs)
+    if current == 'memory':
+        memory_queue.append((name, json.loads(payload)))
+        return None
+    return Task.objects.create(name=name, payload=payload)
+
+
+def run_pending():
+    """Выполняет всё, что накопилось в очереди режима memory."""
+    grouped = defaultdict(list)
+    while memory_queue:
+        name, kwargs = memory_queue.popleft()
+        grouped[name].append(kwargs)
+    for name, payloads in grouped.items():
+        registry[name].run(payloads)
+    return sum(len(payloads) for payloads in grouped.values())
+
+
+def backoff(attempts):
+    base = getattr(settings, 'BACKGROUND_RETRY_DELAY', 10)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+class Worker:
+    """
+    Забирает задачи из таблицы Task и выполняет их.
+
+    Захват сделан одним UPDATE по id, совместимым с SQLite: строка
+    достаётся тому воркеру, чей UPDATE прошёл первым. Задачи упавшего
+    воркера снова становятся доступны после locked_until.
+    """
+
+    def __init__(self, batch_size=50, lease=300, poll_interval=1.0):
+        self.batch_size = batch_size
+        self.lease = timedelta(seconds=lease)
+        self.poll_interval = poll_interval
+        self.token = '{}:{}:{}'.format(
+            socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8]
+        )
+
+    def claim(self):
+        now = timezone.now()
+        available = Q(status=Task.PENDING, run_at__lte=now) | Q(
+            status=Task.RUNNING, locked_until__lt=now
+        )
+        ids = list(
+            Task.objects.filter(available)
+            .order_by('name', 'run_at')
+            .values_list('pk', flat=True)[:self.batch_size]
+        )
+        if not ids:
+            return []
+        Task.objects.filter(available, pk__in=ids).update(
+            status=Task.RUNNING,
+            worker=self.token,
+            locked_until=now + self.lease
+        )
+        return list(
+            Task.objects.filter(worker=self.token, status=Task.RUNNING)
+            .order_by('name', 'run_at')
+        )
+
+    def run_once(self):
+        tasks = self.claim()
+        for name, group in groupby(tasks, key=lambda item: item.name):
+            self.execute(name, list(group))
+        return len(tasks)
+
+    def execute(self, name, tasks):
+        func = registry.get(name)
+        task_started.send(sender=type(self), name=name)
+        try:
+            if func is None:
+                raise KeyError(f'Unknown task {name!r}')
+            func.run([json.loads(item.payload) for item in tasks])
+        except Exception:
+            logger.exception('Task %s failed', name)
+            self.retry(tasks, traceback.format_exc(), func)
+        else:
+            Task.objects.filter(pk__in=[item.pk for item in tasks]).update(
+                status=Task.DONE, locked_until=None
+            )
+        finally:
+            task_finished.send(sender=type(self), name=name)
+
+    def retry(self, tasks, error, func):
+        max_attempts = func.max_attempts if func else 1
+        now = timezone.now()
+        for item in tasks:
+            item.attempts += 1
+            item.last_error = error
+            item.locked_until = None
+            if item.attempts >= max_attempts:
+                item.status = Task.FAILED
+            else:
+                item.status = Task.PENDING
+                item.run_at = now + backoff(item.attempts)
+            item.save(update_fields=[
+                'attempts', 'last_error', 'locked_until', 'status', 'run_at'
+            ])
+
+    def run(self, once=False):
+        """Крутится бесконечно; с once=True — пока очередь не опустеет."""
+        total = 0
+        while True:
+            close_old_connections()
+            done = self.run_once()
+            total += done
+            if done:
+                continue
+            if once:
+                return total
+            time.sleep(self.poll_interval)
@@ -0,0 +1,46 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from background.core import Worker
+
+
+def work(options):
+    Worker(
+        batch_size=options['batch_size'],
+        lease=options['lease'],
+        poll_interval=options['poll_interval'],
+    ).run(once=options['once'])
+
+
+class Command(BaseCommand):
+    help = 'Запускает воркеры фоновых задач.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=50)
+        parser.add_argument(
+            '--lease', type=int, default=300,
+            help='Через сколько секунд задачу упавшего воркера возьмёт другой.'
+        )
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить накопившиеся задачи и выйти.'
+        )
+
+    def handle(self, *args, **options):
+        if options['workers'] == 1:
+            work(options)
+            return
+        # Дочерние процессы не должны делить соединения с родителем.
+        connections.close_all()
+        processes = [
+            multiprocessing.Process(target=work, args=(options,))
+            for _ in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
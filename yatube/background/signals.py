@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Воркер шлёт их вокруг каждой пачки задач одного типа: name — имя задачи.
+task_started = Signal(providing_args=['name'])
+task_finished = Signal(providing_args=['name'])
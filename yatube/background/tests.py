@@ -0,0 +1,60 @@
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from background import core
+from background.core import Worker, task
+from background.models import Task
+
+calls = []
+
+
+@task(name='test.collect', batch=True)
+def collect(payloads):
+    calls.append(sorted(item['n'] for item in payloads))
+
+
+@task(name='test.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('boom')
+
+
+class WorkerTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_batches_same_type(self):
+        """Задачи одного типа выполняются одним вызовом."""
+        for n in range(3):
+            collect.delay(n=n)
+        self.assertEqual(Worker().run(once=True), 3)
+        self.assertEqual(calls, [[0, 1, 2]])
+        self.assertEqual(Task.objects.filter(status=Task.DONE).count(), 3)
+
+    def test_retry_with_backoff_then_fail(self):
+        broken.delay()
+        Worker().run(once=True)
+        item = Task.objects.get()
+        self.assertEqual(item.status, Task.PENDING)
+        self.assertEqual(item.attempts, 1)
+        self.assertGreater(item.run_at, timezone.now())
+        self.assertIn('boom', item.last_error)
+        Task.objects.update(run_at=timezone.now())
+        Worker().run(once=True)
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_expired_lease_is_reclaimed(self):
+        collect.delay(n=1)
+        Task.objects.update(
+            status=Task.RUNNING,
+            worker='dead',
+            locked_until=timezone.now()
+        )
+        Worker().run(once=True)
+        self.assertEqual(calls, [[1]])
+
+    @override_settings(BACKGROUND_TASKS='memory')
+    def test_memory_mode(self):
+        collect.delay(n=5)
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(core.run_pending(), 1)
+        self.assertEqual(calls, [[5]])
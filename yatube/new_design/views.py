@@ -1,6 +1,6 @@
-from django.shortcuts import render
+from yatube.streaming import render_stream
 
 # Create your views here.
 
 def index_new(request):
-    return render(request,'index_new.html')
\ No newline at end of file
+    return render_stream(request, 'index_new.html')
@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Digest, Event
+
+
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'kind', 'recipient', 'actor', 'read', 'created')
+    list_filter = ('kind', 'read')
+    raw_id_fields = ('recipient', 'actor', 'post', 'digest')
+
+
+class DigestAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipient', 'text', 'created')
+    raw_id_fields = ('recipient',)
+
+
+admin.site.register(Event, EventAdmin)
+admin.site.register(Digest, DigestAdmin)
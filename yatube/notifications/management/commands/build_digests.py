@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from notifications.services import build_digests
+
+
+class Command(BaseCommand):
+    help = 'Собирает новые события в сводки для получателей.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        digests = build_digests(batch_size=options['batch_size'])
+        self.stdout.write(f'{digests} digests built')
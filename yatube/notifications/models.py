@@ -0,0 +1,67 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class Digest(models.Model):
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='digests'
+    )
+    text = models.TextField(verbose_name='Сводка')
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [models.Index(fields=['recipient', '-created'])]
+
+    def __str__(self):
+        return self.text[:50]
+
+
+class Event(models.Model):
+    COMMENT = 'comment'
+    FOLLOW = 'follow'
+    KINDS = [
+        (COMMENT, 'Новый комментарий'),
+        (FOLLOW, 'Новый подписчик'),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KINDS)
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    actor = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='+',
+        blank=True,
+        null=True
+    )
+    digest = models.ForeignKey(
+        Digest,
+        on_delete=models.SET_NULL,
+        related_name='events',
+        blank=True,
+        null=True
+    )
+    read = models.BooleanField(default=False)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created']
+        indexes = [
+            models.Index(fields=['recipient', 'read']),
+            models.Index(fields=['digest', 'recipient']),
+        ]
@@ -0,0 +1,107 @@
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Digest, Event
+
+KIND_LABELS = {
+    Event.COMMENT: 'новых комментариев',
+    Event.FOLLOW: 'новых подписчиков',
+}
+
+
+def unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def record(kind, recipient, actor, post=None):
+    """Записывает одно событие; себя не уведомляем."""
+    if recipient.pk == actor.pk:
+        return
+    record_many([Event(kind=kind, recipient=recipient, actor=actor,
+                       post=post)])
+
+
+def record_many(events):
+    """Добавляет события одной вставкой и наращивает счётчики."""
+    Event.objects.bulk_create(events)
+    per_user = Counter(event.recipient_id for event in events)
+    for user_id, count in per_user.items():
+        try:
+            cache.incr(unread_key(user_id), count)
+        except ValueError:
+            # Счётчика нет в кэше: его посчитают при следующем чтении.
+            pass
+
+
+def unread_count(user):
+    key = unread_key(user.pk)
+    count = cache.get(key)
+    if count is None:
+        count = Event.objects.filter(recipient=user, read=False).count()
+        cache.add(key, count, settings.NOTIFICATIONS_COUNTER_TIMEOUT)
+    return count
+
+
+def mark_read(user):
+    Event.objects.filter(recipient=user, read=False).update(read=True)
+    cache.set(unread_key(user.pk), 0, settings.NOTIFICATIONS_COUNTER_TIMEOUT)
+
+
+def delete_user_events(user_id, batch_size=500, pause=0.0):
+    """
+    Удаляет события пользователя пачками: и полученные, и те, где он
+    автор. У получателей сбрасываются счётчики непрочитанного.
+    """
+    events = Event.objects.filter(
+        Q(recipient_id=user_id) | Q(actor_id=user_id)
+    )
+    deleted = 0
+    while True:
+        rows = list(events.values_list('id', 'recipient_id')[:batch_size])
+        if not rows:
+            return deleted
+        deleted += Event.objects.filter(
+            id__in=[event_id for event_id, _ in rows]
+        ).delete()[0]
+        recipients = {recipient_id for _, recipient_id in rows}
+        cache.delete_many([unread_key(user) for user in recipients])
+        if pause:
+            time.sleep(pause)
+
+
+def build_digests(batch_size=1000):
+    """
+    Сворачивает события, ещё не попавшие в сводку, в одну сводку
+    на получателя. Обрабатывает не больше batch_size событий за проход.
+    """
+    digests = 0
+    while True:
+        events = list(
+            Event.objects.filter(digest__isnull=True)
+            .order_by('id')
+            .values_list('id', 'recipient_id', 'kind')[:batch_size]
+        )
+        if not events:
+            return digests
+        grouped = defaultdict(list)
+        for event_id, recipient_id, kind in events:
+            grouped[recipient_id].append((event_id, kind))
+        with transaction.atomic():
+            for recipient_id, items in grouped.items():
+                kinds = Counter(kind for _, kind in items)
+                text = ', '.join(
+                    f'{KIND_LABELS[kind]}: {count}'
+                    for kind, count in sorted(kinds.items())
+                )
+                digest = Digest.objects.create(
+                    recipient_id=recipient_id, text=text
+                )
+                Event.objects.filter(
+                    id__in=[event_id for event_id, _ in items]
+                ).update(digest=digest)
+                digests += 1
@@ -0,0 +1,54 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from notifications.models import Digest, Event
+from notifications.services import build_digests, unread_count
+from posts.models import Post, User
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Maxim')
+        self.reader = User.objects.create_user(username='Uri')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+        self.post = Post.objects.create(text='Test post', author=self.author)
+
+    def comment_and_follow(self):
+        self.reader_client.post(
+            reverse('add_comment', args=['Maxim', self.post.pk]),
+            {'text': 'Отлично'}
+        )
+        self.reader_client.get(reverse('profile_follow', args=['Maxim']))
+
+    def test_events_and_badge(self):
+        """Счётчик в шапке берётся из кэша, а не считается в базе."""
+        self.comment_and_follow()
+        self.assertEqual(unread_count(self.author), 2)
+        Event.objects.all().delete()
+        self.assertEqual(unread_count(self.author), 2)
+        response = self.author_client.get(reverse('follow_index'))
+        self.assertEqual(response.context['unread_notifications'], 2)
+        self.assertContains(response, 'badge')
+
+    def test_own_comment_not_notified(self):
+        self.author_client.post(
+            reverse('add_comment', args=['Maxim', self.post.pk]),
+            {'text': 'Сам себе'}
+        )
+        self.assertFalse(Event.objects.exists())
+
+    def test_digest_and_mark_read(self):
+        self.comment_and_follow()
+        self.assertEqual(build_digests(), 1)
+        self.assertEqual(
+            Digest.objects.get(recipient=self.author).text,
+            'новых комментариев: 1, новых подписчиков: 1'
+        )
+        self.author_client.get(reverse('notifications:index'))
+        self.assertEqual(unread_count(self.author), 0)
+        self.assertFalse(Event.objects.filter(read=False).exists())
@@ -0,0 +1,18 @@
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import render
+
+from .services import mark_read
+
+
+@login_required
+def index(request):
+    digests = request.user.digests.all()[:20]
+    events = request.user.notifications.filter(
+        digest__isnull=True
+    ).select_related('actor', 'post')[:50]
+    context = {
+        'digests': list(digests),
+        'events': list(events),
+    }
+    mark_read(request.user)
+    return render(request, 'notifications/index.html', context)
@@ -1,30 +1,136 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import (IGNORED_PARAMS, PAGE_VAR,
+                                             SEARCH_VAR)
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max
+from django.utils.functional import cached_property
 
+from .autocomplete import group_prefix
 from .models import Comment, Group, Post, Follow
+from .search import search_posts
 
 
-class PostAdmin(admin.ModelAdmin):
+def estimated_count(queryset):
+    """Примерное число строк таблицы без полного COUNT(*)."""
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    if connection.vendor in ('postgresql', 'mysql'):
+        sql = {
+            'postgresql':
+                'SELECT reltuples FROM pg_class WHERE relname = %s',
+            'mysql':
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s',
+        }[connection.vendor]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table])
+            row = cursor.fetchone()
+        return int(row[0]) if row else 0
+    # В SQLite статистики нет, а максимальный id берётся из индекса.
+    return queryset.model._base_manager.using(queryset.db).aggregate(
+        last=Max('pk')
+    )['last'] or 0
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Считает точно только до exact_limit строк. Дальше для
+    нефильтрованного списка берётся оценка из estimated_count,
+    а для отфильтрованного страницы заканчиваются на exact_limit.
+    """
+
+    exact_limit = 10000
+
+    def __init__(self, *args, estimate=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        exact = self.object_list[:self.exact_limit + 1].count()
+        if exact <= self.exact_limit:
+            return exact
+        if self.estimate:
+            return max(estimated_count(self.object_list), exact)
+        return self.exact_limit
+
+
+class FastModelAdmin(admin.ModelAdmin):
+    """Список объектов без полного COUNT(*) по всей таблице."""
+
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+    def get_paginator(self, request, queryset, per_page, orphans=0,
+                      allow_empty_first_page=True):
+        unfiltered = not request.GET.get(SEARCH_VAR) and all(
+            name in IGNORED_PARAMS or name == PAGE_VAR
+            for name in request.GET
+        )
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page,
+            estimate=unfiltered
+        )
+
+
+class PostAdmin(FastModelAdmin):
     list_display = ('pk', 'text', 'pub_date', 'author', 'group', 'image')
+    list_select_related = ('author', 'group')
     search_fields = ('text',)
-    list_filter = ('pub_date',)
+    date_hierarchy = 'pub_date'
+    raw_id_fields = ('author',)
+    autocomplete_fields = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        #тег ищется по индексу тегов, число — по id, остальное —
+        по полнотекстовому индексу вместо LIKE '%текст%'.
+        """
+        term = search_term.strip()
+        if term.startswith('#'):
+            return queryset.filter(
+                tag_links__tag__name=term[1:].lower()
+            ), False
+        if term.isdigit():
+            return queryset.filter(pk=int(term)), False
+        if term:
+            found = search_posts(queryset, term)
+            if found is not None:
+                return found, False
+        return super().get_search_results(request, queryset, search_term)
+
 
 class GroupAdmin(admin.ModelAdmin):
     list_display = ('pk', 'description', 'title', 'slug')
-    search_fields = ('description', 'title')
+    search_fields = ('title',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Поиск, в том числе для autocomplete_fields, — по началу названия
+        или slug через диапазон по индексу, без LIKE '%текст%'.
+        """
+        term = search_term.strip()
+        if term:
+            return queryset.filter(group_prefix(term)), False
+        return queryset, False
+
 
-class CommentAdmin(admin.ModelAdmin):
+class CommentAdmin(FastModelAdmin):
     list_display = ('post', 'author', 'text', 'created')
+    list_select_related = ('post', 'author')
+    raw_id_fields = ('post', 'author')
     empty_value_display = '-пусто-'
 
-class FollowAdmin(admin.ModelAdmin):
+class FollowAdmin(FastModelAdmin):
     list_display = ('user', 'author')
+    list_select_related = ('user', 'author')
+    raw_id_fields = ('user', 'author')
 
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment, CommentAdmin)
-admin.site.register(Follow, FollowAdmin)
\ No newline at end of file
+admin.site.register(Follow, FollowAdmin)
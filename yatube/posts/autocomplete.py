@@ -0,0 +1,64 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import Group
+
+VERSION_KEY = 'groups:autocomplete:version'
+# Символ больше любого другого: [prefix, prefix + MAX_CHAR) — все
+# строки, начинающиеся с prefix.
+MAX_CHAR = '\U0010ffff'
+
+
+def prefix_range(field, prefix):
+    return Q(**{f'{field}__gte': prefix, f'{field}__lt': prefix + MAX_CHAR})
+
+
+def group_prefix(prefix):
+    """
+    Условие «название или slug начинаются с prefix».
+
+    Вместо LIKE берётся диапазон по индексу; регистр первой буквы
+    не важен, остальное сравнивается как есть.
+    """
+    condition = Q()
+    for variant in {prefix, prefix[:1].upper() + prefix[1:],
+                    prefix[:1].lower() + prefix[1:]}:
+        condition |= prefix_range('title', variant)
+        condition |= prefix_range('slug', variant)
+    return condition
+
+
+def find_groups(prefix, limit):
+    """Группы, у которых название или slug начинаются с prefix."""
+    return list(
+        Group.objects.filter(group_prefix(prefix)).order_by('title').values(
+            'id', 'title', 'slug'
+        )[:limit]
+    )
+
+
+def cache_key(prefix):
+    version = cache.get_or_set(VERSION_KEY, 1, None)
+    digest = hashlib.md5(prefix.encode()).hexdigest()
+    return f'groups:autocomplete:{version}:{digest}'
+
+
+def search_groups(prefix):
+    """Результат find_groups, закэшированный для каждого префикса."""
+    key = cache_key(prefix)
+    groups = cache.get(key)
+    if groups is None:
+        groups = find_groups(prefix, settings.GROUP_AUTOCOMPLETE_LIMIT)
+        cache.set(key, groups, settings.GROUP_AUTOCOMPLETE_TIMEOUT)
+    return groups
+
+
+def groups_changed():
+    """Сбрасывает кэш подсказок, меняя версию в ключах."""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        pass
@@ -0,0 +1,111 @@
+import atexit
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import DatabaseError
+from django.db.models import F
+
+from yatube.ratelimit import client_ident
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class ViewBuffer:
+    """
+    Просмотры постов, накопленные процессом до записи в базу.
+
+    Вместо UPDATE на каждый показ поста счётчики копятся в памяти
+    и сбрасываются пачкой раз в VIEW_FLUSH_INTERVAL секунд или когда
+    в буфере набирается VIEW_FLUSH_SIZE постов. При падении процесса
+    теряется не больше одного такого окна.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = Counter()
+        self._flushed_at = time.monotonic()
+
+    def add(self, post_id, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._counts[post_id] += 1
+            due = (
+                len(self._counts) >= _setting('VIEW_FLUSH_SIZE', 1000)
+                or now - self._flushed_at
+                >= _setting('VIEW_FLUSH_INTERVAL', 10)
+            )
+        if due:
+            self.flush(now)
+
+    def pending(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def flush(self, now=None):
+        """
+        Пишет накопленное: один UPDATE на каждое различное приращение,
+        views = views + n для всех постов с этим n.
+        """
+        with self._lock:
+            counts, self._counts = self._counts, Counter()
+            self._flushed_at = time.monotonic() if now is None else now
+        by_increment = defaultdict(list)
+        for post_id, increment in counts.items():
+            by_increment[increment].append(post_id)
+        written = 0
+        for increment, ids in sorted(by_increment.items()):
+            try:
+                Post.all_objects.filter(pk__in=ids).update(
+                    views=F('views') + increment
+                )
+            except DatabaseError:
+                # Просмотры возвращаются в буфер до следующего flush.
+                logger.exception('Failed to write %d views', len(ids))
+                self.restore(ids, increment)
+                continue
+            written += increment * len(ids)
+        return written
+
+    def restore(self, ids, increment):
+        with self._lock:
+            for post_id in ids:
+                self._counts[post_id] += increment
+
+
+views = ViewBuffer()
+atexit.register(views.flush)
+
+
+def visitor(request):
+    """Сессия, если она уже есть, иначе адрес и User-Agent."""
+    session_key = request.session.session_key
+    if session_key:
+        return session_key
+    agent = request.META.get('HTTP_USER_AGENT', '')
+    raw = client_ident(request, 'ip') + agent
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def record_view(request, post):
+    """
+    Засчитывает просмотр, если посетитель не видел пост последние
+    VIEW_DEDUP_TIMEOUT секунд. Сессия не создаётся, чтобы анонимные
+    страницы оставались кэшируемыми.
+    """
+    seen_key = f'views:seen:{post.pk}:{visitor(request)}'
+    seen = caches[_setting('VIEW_DEDUP_CACHE', 'views')]
+    if not seen.add(seen_key, 1, _setting('VIEW_DEDUP_TIMEOUT', 60 * 30)):
+        return False
+    views.add(post.pk)
+    return True
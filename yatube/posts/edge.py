@@ -0,0 +1,46 @@
+from django.conf import settings
+
+from yatube.edge import POSTS_KEY, key, purge_later
+
+from .models import Group, User
+
+
+def purge_post(post, group_ids=()):
+    """
+    Очищает у прокси страницы, где виден пост: саму запись,
+    профиль автора, ленты и группы (текущую и group_ids).
+    """
+    if not settings.EDGE_PURGE_URL:
+        return
+    group_ids = {post.group_id, *group_ids} - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    ) if group_ids else []
+    purge_later(
+        POSTS_KEY,
+        key('post', post.pk),
+        key('user', post.author.username),
+        *[key('group', slug) for slug in slugs]
+    )
+
+
+def purge_users(*user_ids):
+    if not settings.EDGE_PURGE_URL:
+        return
+    usernames = User.objects.filter(pk__in=user_ids).values_list(
+        'username', flat=True
+    )
+    purge_later(*[key('user', username) for username in usernames])
+
+
+def purge_comment(comment):
+    """Очищает запись и профиль её автора: там видно число комментариев."""
+    if not settings.EDGE_PURGE_URL:
+        return
+    usernames = User.objects.filter(posts=comment.post_id).values_list(
+        'username', flat=True
+    )
+    purge_later(
+        key('post', comment.post_id),
+        *[key('user', username) for username in usernames]
+    )
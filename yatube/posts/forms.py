@@ -1,12 +1,14 @@
 from django.forms import ModelForm
 
 from .models import Comment, Post, Group
+from .widgets import GroupAutocomplete
 
 
 class PostForm(ModelForm):
     class Meta:
         model = Post
         fields = ['group', 'text', 'image']
+        widgets = {'group': GroupAutocomplete}
 
 
 class CommentForm(ModelForm):
@@ -0,0 +1,47 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.models import Max, Min
+
+from posts.models import Post
+from posts.tags import index_posts
+
+
+def index_chunk(bounds):
+    start, stop = bounds
+    posts = Post.all_objects.filter(pk__gte=start, pk__lt=stop).only(
+        'id', 'text'
+    )
+    index_posts(posts)
+
+
+class Command(BaseCommand):
+    help = 'Заполняет индекс хэштегов и упоминаний для существующих постов.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument(
+            '--chunk-size', type=int, default=1000,
+            help='Сколько id постов обрабатывает один кусок.'
+        )
+
+    def handle(self, *args, **options):
+        bounds = Post.all_objects.aggregate(first=Min('id'), last=Max('id'))
+        if bounds['first'] is None:
+            return
+        size = options['chunk_size']
+        chunks = [
+            (start, start + size)
+            for start in range(bounds['first'], bounds['last'] + 1, size)
+        ]
+        if options['workers'] == 1:
+            for chunk in chunks:
+                index_chunk(chunk)
+        else:
+            # Дочерние процессы не должны делить соединения с родителем.
+            connections.close_all()
+            with multiprocessing.Pool(options['workers']) as pool:
+                for _ in pool.imap_unordered(index_chunk, chunks):
+                    pass
+        self.stdout.write(f'{len(chunks)} chunks indexed')
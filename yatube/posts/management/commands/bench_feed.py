@@ -0,0 +1,121 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import engines
+from django.test import RequestFactory
+
+from posts.models import Group, Post, User
+from posts.views import feed
+
+# Карточка поста до post_card: includes/post_item.html, теперь только
+# как точка отсчёта для замера.
+POST_ITEM = """
+<div class="card mb-3 mt-1 shadow-sm">
+  {% load thumbnail %}
+  {% thumbnail post.image "960x339" crop="center" upscale=True as im %}
+      <img class="img-thumbnail" src="{{ im.url }}"/>
+  {% endthumbnail %}
+<div class="card-body">
+<p class="card-text">
+  <a name="post_{{ post.id }}" href="{% url 'profile' post.author.username %}">
+    <strong class="d-block text-gray-dark">@{{ post.author }}</strong>
+  </a>
+  {{ post.text|linebreaksbr }}
+</p>
+{% if post.group %}
+<a class="card-link muted" href="{% url 'group' post.group.slug %}">
+  <strong class="d-block text-gray-dark">#{{ post.group.title }}</strong>
+</a>
+{% endif %}
+<div class="d-flex justify-content-between align-items-center">
+  <div>
+    {% if post.comments.exists %}
+    <div>
+      Комментариев: {{ post.comments.count }}
+    </div>
+    {% endif %}
+    <a class="btn btn-sm btn-primary"
+       href="{% url 'post' post.author.username post.id %}" role="button">
+      Добавить комментарий
+    </a>
+    {% if user == post.author %}
+    <a class="btn btn-sm btn-info"
+       href="{% url 'post_edit' post.author.username post.id %}"
+       role="button">
+      Редактировать
+    </a>
+    <a class="btn btn-sm btn-danger"
+       href="{% url 'post_delete' post.author.username post.id %}"
+       role="button">
+      Удалить пост
+    </a>
+    {% endif %}
+  </div>
+  <small class="text-muted">{{ post.pub_date }}</small>
+</div>
+</div>
+</div>
+"""
+BEFORE = (
+    '{% for post in posts %}'
+    '{% include post_item with post=post %}'
+    '{% endfor %}'
+)
+AFTER = (
+    '{% load post_tags %}'
+    '{% for post in posts %}{% post_card post %}{% endfor %}'
+)
+
+
+class Command(BaseCommand):
+    help = 'Сравнивает стоимость рендера карточки поста: include и post_card.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', nargs='+', type=int, default=[10, 50, 100]
+        )
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        sizes = options['sizes']
+        with transaction.atomic():
+            posts = self.create_posts(max(sizes))
+            for size in sizes:
+                self.report(size, posts, options['repeat'])
+            transaction.set_rollback(True)
+
+    def create_posts(self, count):
+        author = User.objects.create_user(username='bench_feed_author')
+        group = Group.objects.create(
+            title='bench', slug='bench-feed', description='bench'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'bench post {i}\nline', author=author, group=group)
+            for i in range(count)
+        )
+        return author
+
+    def report(self, size, author, repeat):
+        request = RequestFactory().get('/')
+        request.user = author
+        engine = engines['django']
+        post_item = engine.from_string(POST_ITEM)
+        results = {}
+        for name, source, queryset in (
+            ('include', BEFORE, Post.objects.filter(author=author)),
+            ('post_card', AFTER, feed(Post.objects.filter(author=author))),
+        ):
+            template = engine.from_string(source)
+            posts = list(queryset[:size])
+            context = {'posts': posts, 'user': author, 'post_item': post_item}
+            started = time.perf_counter()
+            for _ in range(repeat):
+                template.render(context, request)
+            elapsed = time.perf_counter() - started
+            results[name] = elapsed / repeat / size * 1e6
+        self.stdout.write(
+            f'{size:>4} posts: include {results["include"]:8.1f} us/post, '
+            f'post_card {results["post_card"]:8.1f} us/post '
+            f'(x{results["include"] / results["post_card"]:.1f})'
+        )
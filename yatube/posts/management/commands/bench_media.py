@@ -0,0 +1,59 @@
+import os
+import tempfile
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory, override_settings
+from django.views.static import serve
+
+from yatube.media import serve_media
+
+
+def consume(response):
+    if response.streaming:
+        size = sum(len(chunk) for chunk in response.streaming_content)
+    else:
+        size = len(response.content)
+    response.close()
+    return size
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность django.views.static.serve '
+        'и serve_media на полном файле и на диапазоне.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--size-mb', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=10)
+
+    def handle(self, *args, **options):
+        size = options['size_mb'] * 1024 * 1024
+        with tempfile.TemporaryDirectory() as root:
+            with open(os.path.join(root, 'bench.jpg'), 'wb') as bench_file:
+                bench_file.write(os.urandom(size))
+            with override_settings(MEDIA_ROOT=root):
+                factory = RequestFactory()
+                cases = (
+                    ('static.serve', serve, {'document_root': root}, {}),
+                    ('serve_media', serve_media, {}, {}),
+                    ('serve_media 1MB range', serve_media, {},
+                     {'HTTP_RANGE': 'bytes=0-1048575'}),
+                )
+                for name, view, kwargs, headers in cases:
+                    self.report(
+                        name, view, kwargs, factory.get('/', **headers),
+                        options['repeat']
+                    )
+
+    def report(self, name, view, kwargs, request, repeat):
+        sent = 0
+        started = time.perf_counter()
+        for _ in range(repeat):
+            sent += consume(view(request, 'bench.jpg', **kwargs))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{name:>22}: {sent / elapsed / 1024 / 1024:8.1f} MB/s, '
+            f'{elapsed / repeat * 1000:7.2f} ms/request'
+        )
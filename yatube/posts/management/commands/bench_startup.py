@@ -0,0 +1,66 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Выполняется в отдельном процессе, чтобы мерить холодный старт.
+SCRIPT = '''
+import json, sys, time
+started = time.perf_counter()
+from yatube.wsgi import application
+from yatube.warmup import wsgi_get
+loaded = time.perf_counter()
+requests = []
+for _ in range(2):
+    begin = time.perf_counter()
+    wsgi_get(application, sys.argv[1])
+    requests.append(time.perf_counter() - begin)
+print(json.dumps({
+    'startup': loaded - started,
+    'first': requests[0],
+    'second': requests[1],
+}))
+'''
+
+
+class Command(BaseCommand):
+    help = (
+        'Измеряет время запуска воркера и первого запроса '
+        'с прогревом и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='/')
+        parser.add_argument('--runs', type=int, default=3)
+
+    def measure(self, warmup, url):
+        env = dict(os.environ, YATUBE_WARMUP='1' if warmup else '0')
+        output = subprocess.run(
+            [sys.executable, '-c', SCRIPT, url],
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.PIPE,
+            check=True,
+        ).stdout
+        return json.loads(output.decode().strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        for warmup in (False, True):
+            runs = [
+                self.measure(warmup, options['url'])
+                for _ in range(options['runs'])
+            ]
+            medians = {
+                key: statistics.median(run[key] for run in runs) * 1000
+                for key in ('startup', 'first', 'second')
+            }
+            self.stdout.write(
+                '{:>10}: startup {startup:8.1f} ms, first request '
+                '{first:7.2f} ms, second {second:7.2f} ms'.format(
+                    'warmup' if warmup else 'cold', **medians
+                )
+            )
@@ -0,0 +1,79 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+from yatube.warmup import warm_host
+
+
+def timed_get(client, url):
+    """Время до первого куска тела, до последнего и число кусков."""
+    started = time.perf_counter()
+    response = client.get(url)
+    if not response.streaming:
+        ready = time.perf_counter() - started
+        return ready, ready, 1
+    # Дочитанный поток test client закрывает сам.
+    chunks = iter(response.streaming_content)
+    first = next(chunks, b'')
+    ttfb = time.perf_counter() - started
+    count = 1 + sum(1 for _ in chunks) if first else 0
+    total = time.perf_counter() - started
+    return ttfb, total, count
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время до первого байта (TTFB) и полное время '
+        'профиля и записи с потоковым рендером и без него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=200)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--encoding', default='gzip')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            urls = self.create_pages(options['comments'])
+            client = Client(
+                HTTP_HOST=warm_host(),
+                HTTP_ACCEPT_ENCODING=options['encoding'],
+            )
+            for name, url in urls:
+                for streaming in (False, True):
+                    with override_settings(STREAM_RESPONSES=streaming):
+                        self.report(
+                            name, streaming, client, url, options['repeat']
+                        )
+            transaction.set_rollback(True)
+
+    def create_pages(self, comments):
+        author = User.objects.create_user(username='bench_stream_author')
+        posts = [
+            Post.objects.create(text=f'bench post {i}\nline', author=author)
+            for i in range(10)
+        ]
+        Comment.all_objects.using(posts[0]._state.db).bulk_create(
+            Comment(post=posts[0], author=author, text=f'bench comment {i}')
+            for i in range(comments)
+        )
+        return [
+            ('profile', reverse('profile', args=[author.username])),
+            ('post', reverse('post', args=[author.username, posts[0].pk])),
+        ]
+
+    def report(self, name, streaming, client, url, repeat):
+        timed_get(client, url)
+        runs = [timed_get(client, url) for _ in range(repeat)]
+        ttfb = statistics.median(run[0] for run in runs) * 1000
+        total = statistics.median(run[1] for run in runs) * 1000
+        self.stdout.write(
+            f'{name:>8} {"stream" if streaming else "render":>6}: '
+            f'TTFB {ttfb:7.2f} ms, total {total:7.2f} ms, '
+            f'{runs[0][2]} chunks'
+        )
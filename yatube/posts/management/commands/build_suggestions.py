@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.recommendations import rebuild_suggestions
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает подсказки «На кого подписаться» по графу подписок.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        graph = rebuild_suggestions(batch_size=options['batch_size'])
+        self.stdout.write(
+            f'{len(graph.ids)} users, {len(graph.out_indices)} follows, '
+            f'{time.perf_counter() - started:.2f}s'
+        )
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from posts.media_gc import sweeps
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет из media/posts и кэша sorl файлы, на которые никто не '
+        'ссылается. За запуск проверяет не больше --limit файлов в '
+        'каждом каталоге и продолжает с места прошлого запуска.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--min-age', type=int, default=60 * 60,
+            help='Не трогать файлы моложе стольких секунд.'
+        )
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками, секунды.'
+        )
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        total = 0
+        for sweep in sweeps():
+            stats = sweep.run(
+                options['limit'], options['batch_size'],
+                options['min_age'], options['dry_run'], options['pause']
+            )
+            total += stats['bytes']
+            self.stdout.write(
+                f'{sweep.prefix}: {stats["examined"]} examined, '
+                f'{stats["deleted"]} deleted, {stats["bytes"]} bytes, '
+                f'cursor {stats["cursor"] or "-"}'
+            )
+        self.stdout.write(f'{total} bytes reclaimed')
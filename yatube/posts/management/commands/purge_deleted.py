@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from posts.purge import purge_deleted
+
+
+class Command(BaseCommand):
+    help = 'Удаляет помеченные на удаление посты и комментарии пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Пауза между пачками, секунды.'
+        )
+
+    def handle(self, *args, **options):
+        posts, comments = purge_deleted(
+            options['batch_size'], options['pause']
+        )
+        self.stdout.write(f'{posts} posts, {comments} comments deleted')
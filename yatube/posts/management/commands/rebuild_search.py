@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from posts.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересобирает поисковый индекс постов. Нужен после массовых '
+        'правок в обход сигналов (bulk_create, update()).'
+    )
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index()
+        if indexed is None:
+            self.stdout.write('Full-text index not supported')
+        else:
+            self.stdout.write(f'{indexed} posts indexed')
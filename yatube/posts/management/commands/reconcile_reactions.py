@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import Comment, Post
+from posts.reactions import reconcile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сверяет шардированные счётчики реакций с таблицами реакций '
+        'и сворачивает шарды.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = reconcile(Post, options['batch_size'])
+        comments = reconcile(Comment, options['batch_size'])
+        self.stdout.write(
+            f'{posts} post counters, {comments} comment counters fixed'
+        )
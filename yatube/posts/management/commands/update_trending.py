@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import update_trending
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает популярные посты и группы.'
+
+    def handle(self, *args, **options):
+        posts, groups = update_trending()
+        self.stdout.write(f'{posts} posts, {groups} groups scored')
@@ -0,0 +1,168 @@
+import logging
+import os
+import time
+from itertools import islice
+
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail import delete as delete_image
+from sorl.thumbnail.images import ImageFile
+from sorl.thumbnail.kvstores.base import add_prefix
+from sorl.thumbnail.models import KVStore
+
+from archive.models import ArchivedPost
+
+from .models import ImageBlob, MediaCursor, Post
+
+logger = logging.getLogger(__name__)
+
+ORIGINALS = 'posts'
+
+
+def thumbnails_prefix():
+    return getattr(settings, 'THUMBNAIL_PREFIX', 'cache/').strip('/')
+
+
+def walk_after(root, directory, cursor):
+    """
+    Пути файлов под directory в порядке обхода, строго после cursor.
+
+    Пути сравниваются по частям, как идёт обход, а каталоги, целиком
+    лежащие до курсора, не читаются, поэтому продолжение прохода не
+    пересматривает уже пройденную часть дерева.
+    """
+    try:
+        entries = sorted(
+            os.scandir(os.path.join(root, directory)),
+            key=lambda entry: entry.name
+        )
+    except FileNotFoundError:
+        return
+    for entry in entries:
+        name = f'{directory}/{entry.name}'
+        parts = name.split('/')
+        if entry.is_dir(follow_symlinks=False):
+            if parts == cursor[:len(parts)] or parts > cursor:
+                yield from walk_after(root, name, cursor)
+        elif entry.is_file(follow_symlinks=False) and parts > cursor:
+            yield name
+
+
+def live_originals(names):
+    """Имена из names, на которые ссылаются посты, архив или ImageBlob."""
+    live = set(ImageBlob.objects.filter(
+        name__in=names, refs__gt=0
+    ).values_list('name', flat=True))
+    live.update(ArchivedPost.objects.filter(
+        image__in=names
+    ).values_list('image', flat=True))
+    live.update(Post.all_objects.filter(
+        image__in=names
+    ).values_list('image', flat=True))
+    return live
+
+
+def live_thumbnails(names):
+    """Миниатюры из names, о которых знает хранилище ключей sorl."""
+    keys = {
+        add_prefix(ImageFile(name, default.storage).key): name
+        for name in names
+    }
+    found = KVStore.objects.filter(key__in=keys).values_list('key', flat=True)
+    return {keys[key] for key in found}
+
+
+def file_size(storage, name):
+    try:
+        return storage.size(name)
+    except OSError:
+        return 0
+
+
+def delete_original(storage, name):
+    """Удаляет картинку вместе с миниатюрами и их ключами в sorl."""
+    image = ImageFile(name, storage)
+    size = file_size(storage, name)
+    for key in default.kvstore._get(image.key, identity='thumbnails') or []:
+        thumbnail = default.kvstore._get(key)
+        if thumbnail is not None:
+            size += file_size(thumbnail.storage, thumbnail.name)
+    delete_image(image)
+    # Строка с refs=0 остаётся, если удаление после коммита не дошло
+    # до конца, см. posts.signals.delete_unused.
+    ImageBlob.objects.filter(name=name, refs=0).delete()
+    return size
+
+
+def delete_thumbnail(storage, name):
+    size = file_size(storage, name)
+    storage.delete(name)
+    return size
+
+
+class Sweep:
+    """Один ограниченный проход по каталогу с продолжением с курсора."""
+
+    def __init__(self, prefix, storage, live, delete):
+        self.prefix = prefix
+        self.storage = storage
+        self.live = live
+        self.delete = delete
+
+    def run(self, limit, batch_size, min_age, dry_run=False, pause=0.0):
+        """
+        Проверяет не больше limit файлов после курсора пачками по
+        batch_size: живые имена ищутся одним запросом на пачку, а
+        недостижимые файлы старше min_age секунд удаляются. Курсор
+        сохраняется после каждой пачки; дойдя до конца, проход
+        начинается заново при следующем запуске.
+        """
+        state, _ = MediaCursor.objects.get_or_create(prefix=self.prefix)
+        cursor = state.cursor.split('/') if state.cursor else []
+        names = islice(
+            walk_after(self.storage.location, self.prefix, cursor), limit
+        )
+        stats = {'examined': 0, 'deleted': 0, 'bytes': 0}
+        horizon = time.time() - min_age
+        while True:
+            batch = list(islice(names, batch_size))
+            if not batch:
+                break
+            stats['examined'] += len(batch)
+            live = self.live(batch)
+            for name in batch:
+                if name in live:
+                    continue
+                try:
+                    modified = os.stat(self.storage.path(name)).st_mtime
+                except FileNotFoundError:
+                    continue
+                if modified > horizon:
+                    continue
+                stats['deleted'] += 1
+                if dry_run:
+                    stats['bytes'] += file_size(self.storage, name)
+                else:
+                    stats['bytes'] += self.delete(self.storage, name)
+            if not dry_run:
+                state.cursor = batch[-1]
+                state.save(update_fields=['cursor', 'updated'])
+            if pause:
+                time.sleep(pause)
+        if stats['examined'] < limit and not dry_run:
+            state.cursor = ''
+            state.save(update_fields=['cursor', 'updated'])
+        stats['cursor'] = state.cursor
+        logger.info('Media GC %s: %s', self.prefix, stats)
+        return stats
+
+
+def sweeps():
+    storage = Post._meta.get_field('image').storage
+    return [
+        Sweep(ORIGINALS, storage, live_originals, delete_original),
+        Sweep(
+            thumbnails_prefix(), default.storage,
+            live_thumbnails, delete_thumbnail
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 2.2.28 on 2026-10-19 17:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_reactions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaCursor',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=100, unique=True)),
+                ('cursor', models.CharField(blank=True, max_length=255)),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-19 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_media_cursor'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trendingpost',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -1,10 +1,24 @@
 from django.contrib.auth import get_user_model
 from django.db import models
 
+from .storage import ContentAddressedStorage
+
 User = get_user_model()
 
+
+class VisibleManager(models.Manager):
+    """Скрывает записи, помеченные на удаление."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(is_deleted=False)
+
+
 class Group(models.Model):
-    title = models.CharField(max_length=200, verbose_name='Название группы')
+    title = models.CharField(
+        max_length=200,
+        db_index=True,
+        verbose_name='Название группы'
+    )
     slug = models.SlugField(unique=True, verbose_name='Заголовок группы')
     description = models.TextField(verbose_name='Описание группы')
     rules = models.TextField(
@@ -38,13 +52,52 @@ class Post(models.Model):
         verbose_name='Группа',
         help_text='Выберите группу публикации'
     )
-    image = models.ImageField(upload_to='posts/', blank=True, null=True)
+    image = models.ImageField(
+        upload_to='posts/',
+        storage=ContentAddressedStorage(),
+        blank=True,
+        null=True
+    )
+    is_deleted = models.BooleanField(default=False)
+    # Пишется пачками из posts.counters, поэтому может отставать.
+    views = models.PositiveIntegerField(default=0)
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.text[:15]
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='post_deleted_idx',
+                condition=models.Q(is_deleted=True)
+            ),
+        ]
+
+
+class ImageBlob(models.Model):
+    """Сколько постов ссылается на файл из ContentAddressedStorage."""
+
+    name = models.CharField(max_length=255, unique=True)
+    refs = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.name} ({self.refs})'
+
+
+class MediaCursor(models.Model):
+    """Где остановился проход posts.media_gc по каталогу prefix."""
+
+    prefix = models.CharField(max_length=100, unique=True)
+    cursor = models.CharField(max_length=255, blank=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.prefix}: {self.cursor}'
 
 
 class Comment(models.Model):
@@ -61,13 +114,200 @@ class Comment(models.Model):
     )
     text = models.TextField(verbose_name='Текст комментария')
     created = models.DateTimeField('date published', auto_now_add=True)
+    is_deleted = models.BooleanField(default=False)
+
+    objects = VisibleManager()
+    all_objects = models.Manager()
 
     def __str__(self):
         return self.text
 
     class Meta:
         ordering = ['-created']
+        indexes = [
+            models.Index(
+                fields=['id'],
+                name='comment_deleted_idx',
+                condition=models.Q(is_deleted=True)
+            ),
+        ]
 
 class Follow(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='follower')
-    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
\ No newline at end of file
+    author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='following')
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+class Suggestion(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggestions'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    score = models.FloatField(default=0)
+
+    class Meta:
+        ordering = ['-score']
+        unique_together = ['user', 'author']
+        indexes = [models.Index(fields=['user', '-score'])]
+
+
+class TrendingPost(models.Model):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score = models.FloatField(db_index=True)
+    # Считается в update_trending, чтобы страница трендов не
+    # агрегировала комментарии на каждый запрос.
+    comments_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-score']
+
+
+class TrendingGroup(models.Model):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending'
+    )
+    score = models.FloatField(db_index=True)
+
+    class Meta:
+        ordering = ['-score']
+
+
+class Tag(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return f'#{self.name}'
+
+
+class PostTag(models.Model):
+    """Строка индекса: пост помечен хэштегом."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='tag_links'
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='post_links'
+    )
+
+    class Meta:
+        # Индекс (tag, post) обслуживает ленту тега с курсором по post_id.
+        unique_together = ['tag', 'post']
+
+
+class Mention(models.Model):
+    """Строка индекса: в посте упомянут пользователь."""
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions'
+    )
+
+    class Meta:
+        unique_together = ['user', 'post']
+
+
+REACTION_KINDS = [
+    ('like', '👍'),
+    ('love', '❤'),
+    ('laugh', '😂'),
+]
+
+
+class Reaction(models.Model):
+    """Реакция пользователя на пост: не больше одной на пару."""
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='reactions'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reactions'
+    )
+    kind = models.CharField(max_length=10, choices=REACTION_KINDS)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        # Индекс (user, post) отдаёт реакции на страницу ленты одним
+        # запросом: user = ? AND post_id IN (...).
+        unique_together = ['user', 'post']
+
+
+class ReactionCount(models.Model):
+    """
+    Часть счётчика реакций на пост.
+
+    Каждая реакция прибавляет единицу к случайному из REACTION_SHARDS
+    шардов, поэтому одновременные лайки популярного поста не ждут
+    блокировку одной строки. Итог — сумма по шардам.
+    """
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='reaction_counts'
+    )
+    kind = models.CharField(max_length=10, choices=REACTION_KINDS)
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['post', 'kind', 'shard']
+
+
+class CommentReaction(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='comment_reactions'
+    )
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='reactions'
+    )
+    kind = models.CharField(max_length=10, choices=REACTION_KINDS)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['user', 'comment']
+
+
+class CommentReactionCount(models.Model):
+    comment = models.ForeignKey(
+        Comment,
+        on_delete=models.CASCADE,
+        related_name='reaction_counts'
+    )
+    kind = models.CharField(max_length=10, choices=REACTION_KINDS)
+    shard = models.PositiveSmallIntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['comment', 'kind', 'shard']
@@ -0,0 +1,88 @@
+import time
+
+from django.db import transaction
+from django.db.models import Q
+
+from notifications.services import delete_user_events
+
+from .edge import purge_post
+from .models import Comment, Follow, Post, User
+from .reactions import forget_user
+from .search import unindex_search
+from .trending import refresh_comment_counts
+
+
+def soft_delete_post(post):
+    """Скрывает пост сразу; строки удалит purge_deleted."""
+    Post.all_objects.filter(pk=post.pk).update(is_deleted=True)
+    unindex_search([post.pk])
+    purge_post(post)
+
+
+def delete_in_batches(queryset, batch_size, pause):
+    """
+    Удаляет строки пачками по batch_size, каждую в своей транзакции,
+    чтобы SQLite не держал блокировку записи дольше одной пачки.
+    """
+    model = queryset.model
+    db = queryset.db
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic(using=db):
+            deleted += model._base_manager.using(db).filter(
+                pk__in=ids
+            ).delete()[0]
+        if pause:
+            time.sleep(pause)
+
+
+def purge_deleted(batch_size=500, pause=0.0):
+    """Физически удаляет помеченные комментарии и посты."""
+    comments = delete_in_batches(
+        Comment.all_objects.filter(
+            Q(is_deleted=True) | Q(post__is_deleted=True)
+        ),
+        batch_size, pause
+    )
+    # Картинки и миниатюры удаляет сигнал post_delete по счётчику ссылок.
+    posts = delete_in_batches(
+        Post.all_objects.filter(is_deleted=True), batch_size, pause
+    )
+    return posts, comments
+
+
+def schedule_user_deletion(user):
+    """Скрывает контент пользователя и ставит удаление в фоновую очередь."""
+    from .tasks import purge_user
+
+    User.objects.filter(pk=user.pk).update(is_active=False)
+    posts = Post.all_objects.filter(author=user)
+    unindex_search(list(posts.values_list('pk', flat=True)))
+    posts.update(is_deleted=True)
+    Comment.all_objects.filter(author=user).update(is_deleted=True)
+    refresh_comment_counts()
+    purge_user.delay(user_id=user.pk)
+
+
+def purge_user_content(user_id, batch_size=500, pause=0.0):
+    delete_in_batches(
+        Comment.all_objects.filter(
+            Q(author_id=user_id) | Q(post__author_id=user_id)
+        ),
+        batch_size, pause
+    )
+    delete_in_batches(
+        Post.all_objects.filter(author_id=user_id), batch_size, pause
+    )
+    delete_in_batches(
+        Follow.objects.filter(Q(user_id=user_id) | Q(author_id=user_id)),
+        batch_size, pause
+    )
+    # Реакции и события удаляются пачками здесь, а не каскадом
+    # удаления пользователя; счётчики реакций уменьшаются вместе с ними.
+    forget_user(user_id, batch_size, pause)
+    delete_user_events(user_id, batch_size, pause)
+    User.objects.filter(pk=user_id).delete()
@@ -0,0 +1,211 @@
+import random
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+from .models import (REACTION_KINDS, Comment, CommentReaction,
+                     CommentReactionCount, Post, Reaction, ReactionCount)
+
+KINDS = dict(REACTION_KINDS)
+
+# Модель цели -> (таблица реакций, таблица шардов, имя поля цели).
+TABLES = {
+    Post: (Reaction, ReactionCount, 'post'),
+    Comment: (CommentReaction, CommentReactionCount, 'comment'),
+}
+
+
+def counter_shards():
+    return getattr(settings, 'REACTION_SHARDS', 8)
+
+
+def bump(target, kind, delta):
+    """Прибавляет delta к случайному шарду счётчика target/kind."""
+    _, counts, field = TABLES[type(target)]
+    bump_counter(counts, f'{field}_id', target.pk, kind, delta)
+
+
+def bump_counter(counts, column, target_id, kind, delta):
+    shard = random.randrange(counter_shards())
+    lookup = {column: target_id, 'kind': kind, 'shard': shard}
+    rows = counts.objects.filter(**lookup)
+    if rows.update(count=F('count') + delta):
+        return
+    try:
+        with transaction.atomic():
+            counts.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Шард успели создать параллельно.
+        rows.update(count=F('count') + delta)
+
+
+def react(user, target, kind):
+    """
+    Ставит реакцию kind или меняет прежнюю; возвращает False, если
+    такая реакция уже стоит. Правильность держит уникальная пара
+    (user, target), счётчики только следуют за ней.
+    """
+    if kind not in KINDS:
+        raise ValueError(f'Неизвестная реакция: {kind}')
+    reactions, _, field = TABLES[type(target)]
+    with transaction.atomic():
+        try:
+            with transaction.atomic():
+                reactions.objects.create(
+                    user=user, kind=kind, **{field: target}
+                )
+        except IntegrityError:
+            current = reactions.objects.select_for_update().get(
+                user=user, **{field: target}
+            )
+            if current.kind == kind:
+                return False
+            reactions.objects.filter(pk=current.pk).update(kind=kind)
+            bump(target, current.kind, -1)
+        bump(target, kind, 1)
+    return True
+
+
+def unreact(user, target):
+    reactions, _, field = TABLES[type(target)]
+    with transaction.atomic():
+        current = reactions.objects.filter(
+            user=user, **{field: target}
+        ).select_for_update().first()
+        if current is None:
+            return False
+        current.delete()
+        bump(target, current.kind, -1)
+    return True
+
+
+def attach_reactions(items, user):
+    """
+    Добавляет объектам страницы reaction_totals {kind: n} и my_reaction.
+
+    Для всей страницы — один запрос к шардам и, для вошедшего
+    пользователя, один к его реакциям, без запроса на каждый пост.
+    """
+    items = list(items)
+    if not items:
+        return items
+    reactions, counts, field = TABLES[type(items[0])]
+    ids = [item.pk for item in items]
+    totals = defaultdict(dict)
+    rows = counts.objects.filter(**{f'{field}_id__in': ids}).values(
+        f'{field}_id', 'kind'
+    ).annotate(total=Sum('count')).order_by()
+    for row in rows:
+        if row['total'] > 0:
+            totals[row[f'{field}_id']][row['kind']] = row['total']
+    mine = {}
+    if user is not None and user.is_authenticated:
+        mine = dict(reactions.objects.filter(
+            user=user, **{f'{field}_id__in': ids}
+        ).values_list(f'{field}_id', 'kind'))
+    for item in items:
+        item.reaction_totals = totals.get(item.pk, {})
+        item.my_reaction = mine.get(item.pk)
+    return items
+
+
+def target_batches(querysets, column, batch_size):
+    """
+    id целей из всех querysets по возрастанию, пачками по batch_size.
+
+    Каждая пачка — отдельные запросы DISTINCT по ключу после
+    предыдущей, поэтому в памяти не бывает больше пачки id, а между
+    пачками не остаётся открытого курсора, пока пересчёт пишет
+    в те же таблицы.
+    """
+    last = None
+    while True:
+        ids = set()
+        for queryset in querysets:
+            if last is not None:
+                queryset = queryset.filter(**{f'{column}__gt': last})
+            ids.update(queryset.values_list(
+                column, flat=True
+            ).distinct().order_by(column)[:batch_size])
+        if not ids:
+            return
+        batch = sorted(ids)[:batch_size]
+        last = batch[-1]
+        yield batch
+
+
+def forget_user(user_id, batch_size=500, pause=0.0):
+    """
+    Удаляет реакции пользователя пачками и вычитает их из счётчиков.
+
+    Каскад удаления пользователя убрал бы строки реакций мимо
+    счётчиков, и те расходились бы до следующего reconcile.
+    """
+    for reactions, counts, field in TABLES.values():
+        column = f'{field}_id'
+        mine = reactions.objects.filter(user_id=user_id)
+        while True:
+            with transaction.atomic():
+                rows = list(mine.select_for_update().values_list(
+                    'pk', column, 'kind'
+                )[:batch_size])
+                removed = defaultdict(int)
+                for _, target_id, kind in rows:
+                    removed[target_id, kind] += 1
+                reactions.objects.filter(
+                    pk__in=[pk for pk, _, _ in rows]
+                ).delete()
+                for (target_id, kind), count in removed.items():
+                    bump_counter(counts, column, target_id, kind, -count)
+            if not rows:
+                break
+            if pause:
+                time.sleep(pause)
+
+
+def reconcile(model, batch_size=500):
+    """
+    Пересчитывает счётчики по таблице реакций и сворачивает шарды
+    каждой цели в один. Исправляет расхождения после сбоев и не даёт
+    числу строк шардов расти. Возвращает число исправленных счётчиков.
+    """
+    reactions, counts, field = TABLES[model]
+    reactions = reactions.objects
+    counts = counts.objects
+    column = f'{field}_id'
+    fixed = 0
+    for batch in target_batches((counts, reactions), column, batch_size):
+        with transaction.atomic():
+            # Шарды пачки заблокированы: bump ждёт конца пересчёта,
+            # и приращение не теряется между чтением и перезаписью.
+            stored = defaultdict(int)
+            shard_rows = defaultdict(int)
+            for target_id, kind, count in counts.select_for_update().filter(
+                **{f'{column}__in': batch}
+            ).values_list(column, 'kind', 'count'):
+                stored[(target_id, kind)] += count
+                shard_rows[(target_id, kind)] += 1
+            actual = {
+                (row[column], row['kind']): row['total']
+                for row in reactions.filter(
+                    **{f'{column}__in': batch}
+                ).values(column, 'kind').annotate(
+                    total=Count('pk')
+                ).order_by()
+            }
+            for pair in set(actual) | set(stored):
+                total = actual.get(pair, 0)
+                if stored[pair] == total and shard_rows[pair] <= 1:
+                    continue
+                target_id, kind = pair
+                counts.filter(**{column: target_id}, kind=kind).delete()
+                if total:
+                    counts.create(
+                        **{column: target_id}, kind=kind, shard=0,
+                        count=total
+                    )
+                fixed += int(stored[pair] != total)
+    return fixed
@@ -0,0 +1,86 @@
+import re
+
+from django.db import connections, transaction
+
+# Полнотекстовый индекс SQLite FTS5; rowid совпадает с id поста.
+FTS_TABLE = 'posts_post_fts'
+WORD_RE = re.compile(r'\w+')
+
+
+def fts_enabled(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def rebuild_index(using='default'):
+    """
+    Заполняет индекс заново по видимым постам базы using. Нужен после
+    записи в обход сигналов: bulk_create, update() и т. п.
+    """
+    if not fts_enabled(using):
+        return None
+    with transaction.atomic(using=using):
+        with connections[using].cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, text) '
+                f'SELECT id, text FROM posts_post WHERE NOT is_deleted'
+            )
+            return cursor.rowcount
+
+
+def index_search(posts, using='default'):
+    """
+    Переписывает строки индекса для постов.
+
+    Индекс обновляется из сигналов, а не триггерами: при изменении
+    таблицы posts_post SQLite-бэкенд Django пересоздаёт её, и триггеры
+    бы молча пропали.
+    """
+    if not fts_enabled(using):
+        return
+    rows = [(post.pk, post.text) for post in posts]
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _ in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)', rows
+        )
+
+
+def unindex_search(post_ids, using='default'):
+    if not fts_enabled(using):
+        return
+    with connections[using].cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in post_ids]
+        )
+
+
+def match_query(term):
+    """Каждое слово — префиксный токен FTS5, слова объединяются через И."""
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(term))
+
+
+def search_posts(queryset, term):
+    """
+    Фильтрует посты по словам из term через индекс FTS5.
+    Возвращает None, если индекс недоступен.
+    """
+    if not fts_enabled(queryset.db):
+        return None
+    query = match_query(term)
+    if not query:
+        return queryset
+    # pk__in=RawSQL(...) даёт в SQLite IN ((...)) и сравнивает только
+    # с первой строкой подзапроса, поэтому условие пишется целиком.
+    table = queryset.model._meta.db_table
+    return queryset.extra(
+        where=[
+            f'{table}.id IN (SELECT rowid FROM {FTS_TABLE} '
+            f'WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[query]
+    )
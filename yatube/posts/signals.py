@@ -0,0 +1,136 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import (post_delete, post_init, post_save,
+                                      pre_delete)
+from django.dispatch import receiver
+from sorl.thumbnail import delete as delete_image
+from sorl.thumbnail.images import ImageFile
+
+from yatube.edge import key, purge_later
+
+from .autocomplete import groups_changed
+from .edge import purge_comment, purge_post, purge_users
+from .models import Comment, Follow, Group, ImageBlob, Post, User
+from .reactions import forget_user
+from .search import index_search, unindex_search
+from .tags import index_posts
+
+
+def image_name(post):
+    # Через __dict__, чтобы не подгружать отложенное поле.
+    value = post.__dict__.get('image')
+    return getattr(value, 'name', value) or ''
+
+
+def add_ref(name):
+    with transaction.atomic():
+        blob, created = ImageBlob.objects.select_for_update().get_or_create(
+            name=name, defaults={'refs': 1}
+        )
+        if not created:
+            ImageBlob.objects.filter(pk=blob.pk).update(refs=F('refs') + 1)
+
+
+def release_ref(name):
+    """Уменьшает счётчик; без ссылок файл удаляется после коммита."""
+    updated = ImageBlob.objects.filter(name=name, refs__gt=0).update(
+        refs=F('refs') - 1
+    )
+    if updated and ImageBlob.objects.filter(name=name, refs=0).exists():
+        transaction.on_commit(lambda: delete_unused(name))
+
+
+def delete_unused(name):
+    """
+    Удаляет файл с миниатюрами и строку ImageBlob, если на файл так
+    и не сослались снова: до коммита его мог переиспользовать пост
+    с той же картинкой. Строка заблокирована, поэтому add_ref ждёт.
+    """
+    with transaction.atomic():
+        blob = ImageBlob.objects.select_for_update().filter(
+            name=name
+        ).first()
+        if blob is None or blob.refs:
+            return
+        blob.delete()
+        delete_image(ImageFile(name, Post._meta.get_field('image').storage))
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._saved_image = image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_image_refs(sender, instance, **kwargs):
+    new, old = image_name(instance), instance._saved_image
+    if new == old:
+        return
+    if new:
+        add_ref(new)
+    if old:
+        release_ref(old)
+    instance._saved_image = new
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    if instance._saved_image:
+        release_ref(instance._saved_image)
+
+
+@receiver(post_init, sender=Post)
+def remember_fields(sender, instance, **kwargs):
+    instance._saved_text = instance.__dict__.get('text')
+    instance._saved_group_id = instance.__dict__.get('group_id')
+
+
+@receiver(post_save, sender=Post)
+def index_text(sender, instance, created, **kwargs):
+    if created or instance.text != instance._saved_text:
+        index_posts([instance])
+        index_search([instance], using=kwargs['using'])
+        instance._saved_text = instance.text
+
+
+@receiver(post_delete, sender=Post)
+def unindex_text(sender, instance, **kwargs):
+    unindex_search([instance.pk], using=kwargs['using'])
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_group_autocomplete(sender, **kwargs):
+    groups_changed()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def purge_post_pages(sender, instance, **kwargs):
+    # Пост могли перенести в другую группу: очищаем и прежнюю.
+    purge_post(instance, [instance._saved_group_id])
+    instance._saved_group_id = instance.group_id
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, **kwargs):
+    purge_comment(instance)
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group_pages(sender, instance, **kwargs):
+    purge_later(key('group', instance.slug))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def purge_follow_pages(sender, instance, **kwargs):
+    purge_users(instance.user_id, instance.author_id)
+
+
+@receiver(pre_delete, sender=User)
+def forget_user_reactions(sender, instance, **kwargs):
+    # Каскад удалил бы реакции мимо счётчиков.
+    forget_user(instance.pk)
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.utils.deconstruct import deconstructible
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Хранит каждый уникальный файл один раз под именем из его SHA-256.
+
+    Загрузка пишется во временный файл с подсчётом хэша по кусочкам,
+    затем переименовывается в posts/ab/cd/<sha256>.<ext>. Если такой
+    файл уже есть, временный удаляется и возвращается существующее имя,
+    поэтому и миниатюры sorl для повторов строятся один раз.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        directory = os.path.dirname(name)
+        os.makedirs(self.path(directory), exist_ok=True)
+        digest = hashlib.sha256()
+        fd, temp_path = tempfile.mkstemp(
+            dir=self.path(directory), suffix='.upload'
+        )
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    temp_file.write(chunk)
+            final_name = self.hashed_name(
+                directory, digest.hexdigest(), os.path.splitext(name)[1]
+            )
+            full_path = self.path(final_name)
+            if os.path.exists(full_path):
+                os.remove(temp_path)
+                # Свежая дата защищает файл от media_gc, пока пост
+                # с новой ссылкой на него ещё не сохранён.
+                os.utime(full_path)
+            else:
+                os.makedirs(os.path.dirname(full_path), exist_ok=True)
+                if settings.FILE_UPLOAD_PERMISSIONS is not None:
+                    os.chmod(temp_path, settings.FILE_UPLOAD_PERMISSIONS)
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return final_name
+
+    @staticmethod
+    def hashed_name(directory, hexdigest, extension):
+        return '/'.join(filter(None, (
+            directory.replace('\\', '/'),
+            hexdigest[:2],
+            hexdigest[2:4],
+            hexdigest + extension.lower(),
+        )))
@@ -0,0 +1,92 @@
+import re
+
+from django.db import transaction
+
+from .models import Mention, PostTag, Tag, User
+
+HASHTAG_RE = re.compile(r'(?<![\w#])#(\w{1,100})')
+MENTION_RE = re.compile(r'(?<![\w@])@([\w.+-]{1,150})')
+URL_RE = re.compile(r'\bhttps?://\S+', re.IGNORECASE)
+
+
+def find(pattern, text):
+    """Совпадения pattern вне адресов: #якорь в ссылке — не тег."""
+    urls = [match.span() for match in URL_RE.finditer(text)]
+    for match in pattern.finditer(text):
+        if not any(start <= match.start() < end for start, end in urls):
+            yield match
+
+
+def extract_tags(text):
+    return {match.group(1).lower() for match in find(HASHTAG_RE, text or '')}
+
+
+def extract_mentions(text):
+    # Точка или дефис в конце — обычно знак препинания, а не часть имени.
+    return {
+        match.group(1).rstrip('.+-')
+        for match in find(MENTION_RE, text or '')
+    } - {''}
+
+
+def sync_links(model, field, wanted, post_ids):
+    """
+    Приводит строки индекса постов post_ids к набору wanted
+    из пар (post_id, id тега или пользователя).
+    """
+    column = f'{field}_id'
+    existing = {
+        (post_id, value): pk
+        for pk, post_id, value in model.objects.filter(
+            post_id__in=post_ids
+        ).values_list('pk', 'post_id', column)
+    }
+    stale = [pk for pair, pk in existing.items() if pair not in wanted]
+    if stale:
+        model.objects.filter(pk__in=stale).delete()
+    model.objects.bulk_create(
+        [
+            model(post_id=post_id, **{column: value})
+            for post_id, value in wanted
+            if (post_id, value) not in existing
+        ],
+        ignore_conflicts=True
+    )
+
+
+def index_posts(posts):
+    """
+    Обновляет индекс хэштегов и упоминаний для пачки постов.
+
+    Теги создаются одной вставкой с ignore_conflicts, а связи
+    меняются только там, где текст действительно изменился.
+    """
+    posts = list(posts)
+    if not posts:
+        return
+    tags = {post.pk: extract_tags(post.text) for post in posts}
+    mentions = {post.pk: extract_mentions(post.text) for post in posts}
+    names = set().union(*tags.values())
+    usernames = set().union(*mentions.values())
+    with transaction.atomic():
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in names], ignore_conflicts=True
+        )
+        tag_ids = dict(
+            Tag.objects.filter(name__in=names).values_list('name', 'pk')
+        )
+        user_ids = dict(
+            User.objects.filter(username__in=usernames)
+            .values_list('username', 'pk')
+        )
+        sync_links(PostTag, 'tag', {
+            (post_id, tag_ids[name])
+            for post_id, post_names in tags.items()
+            for name in post_names
+        }, list(tags))
+        sync_links(Mention, 'user', {
+            (post_id, user_ids[name])
+            for post_id, post_names in mentions.items()
+            for name in post_names
+            if name in user_ids
+        }, list(mentions))
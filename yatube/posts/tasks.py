@@ -0,0 +1,23 @@
+from background.core import task
+from yatube.edge import send_purge
+
+from .purge import purge_user_content
+from .recommendations import refresh_suggestions
+
+
+@task()
+def purge_user(user_id):
+    """Удаляет пользователя и всё его содержимое пачками."""
+    purge_user_content(user_id)
+
+
+@task()
+def update_suggestions(user_id):
+    """Пересчитывает подсказки после подписки или отписки."""
+    refresh_suggestions(user_id)
+
+
+@task(name='edge.purge', batch=True)
+def purge_edge(payloads):
+    """Очищает кэш прокси по ключам всех задач пачки разом."""
+    send_purge(key for payload in payloads for key in payload['keys'])
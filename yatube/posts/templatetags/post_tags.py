@@ -0,0 +1,217 @@
+import logging
+
+from django import template
+from django.template.base import render_value_in_context
+from django.template.defaultfilters import linebreaksbr
+from django.urls import reverse
+from django.utils.html import escape, format_html
+from django.utils.safestring import mark_safe
+from sorl.thumbnail import get_thumbnail
+
+from posts.models import REACTION_KINDS, User
+from posts.tags import HASHTAG_RE, MENTION_RE, find
+
+register = template.Library()
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_GEOMETRY = '960x339'
+
+
+def cached_reverse(request, name, *args):
+    """reverse() с запоминанием результатов на время запроса."""
+    if request is None:
+        return reverse(name, args=args)
+    urls = request.__dict__.setdefault('_reverse_cache', {})
+    key = (name, args)
+    url = urls.get(key)
+    if url is None:
+        url = urls[key] = reverse(name, args=args)
+    return url
+
+
+def render_thumbnail(image):
+    if not image:
+        return ''
+    try:
+        im = get_thumbnail(
+            image, THUMBNAIL_GEOMETRY, crop='center', upscale=True
+        )
+    except Exception:
+        logger.exception('Thumbnail rendering failed for %s', image)
+        return ''
+    return format_html('<img class="img-thumbnail" src="{}"/>', im.url)
+
+
+def existing_usernames(request, names):
+    """Какие из names — имена пользователей; помнится до конца запроса."""
+    known = {}
+    if request is not None:
+        known = request.__dict__.setdefault('_usernames', {})
+    missing = set(names) - known.keys()
+    if missing:
+        found = set(User.objects.filter(
+            username__in=missing
+        ).values_list('username', flat=True))
+        known.update((name, name in found) for name in missing)
+    return {name for name in names if known[name]}
+
+
+def link_text(request, text):
+    """
+    Экранирует текст поста и превращает #теги и @имена в ссылки.
+    Ссылкой становится только имя существующего пользователя;
+    #якорь и @ внутри адресов остаются текстом.
+    """
+    links = [
+        (match.start(), match.end(), 'tag', match.group(1).lower())
+        for match in find(HASHTAG_RE, text)
+    ]
+    mentions = []
+    for match in find(MENTION_RE, text):
+        # Хвостовая пунктуация остаётся обычным текстом.
+        username = match.group(1).rstrip('.+-')
+        if username:
+            end = match.start(1) + len(username)
+            mentions.append((match.start(), end, 'mentions', username))
+    if mentions:
+        users = existing_usernames(
+            request, {username for *_, username in mentions}
+        )
+        links += [link for link in mentions if link[3] in users]
+    parts = []
+    position = 0
+    for start, end, name, arg in sorted(links):
+        if start < position:
+            continue
+        parts.append(escape(text[position:start]))
+        parts.append(format_html(
+            '<a href="{}">{}</a>',
+            cached_reverse(request, name, arg),
+            text[start:end],
+        ))
+        position = end
+    parts.append(escape(text[position:]))
+    return mark_safe(''.join(parts))
+
+
+def comments_count(post):
+    count = getattr(post, 'comments_count', None)
+    if count is None:
+        count = post.comments.count()
+    return count
+
+
+def render_reactions(context, target, action):
+    """
+    Счётчики реакций из attach_reactions; вошедшему пользователю —
+    кнопками формы, которая ставит или снимает реакцию.
+    """
+    totals = getattr(target, 'reaction_totals', None)
+    if totals is None:
+        return ''
+    user = context.get('user')
+    if user is None or not user.is_authenticated:
+        return ''.join(
+            format_html(
+                '<span class="mr-2">{} {}</span>', label, totals[kind]
+            )
+            for kind, label in REACTION_KINDS if kind in totals
+        )
+    request = context.get('request')
+    next_url = ''
+    if request is not None:
+        next_url = request.get_full_path()
+    parts = [format_html(
+        '<form class="d-inline" method="post" action="{}">'
+        '<input type="hidden" name="csrfmiddlewaretoken" value="{}">'
+        '<input type="hidden" name="next" value="{}">',
+        action, str(context.get('csrf_token', '')), next_url,
+    )]
+    for kind, label in REACTION_KINDS:
+        style = 'outline-secondary'
+        if target.my_reaction == kind:
+            style = 'primary'
+        parts.append(format_html(
+            '<button class="btn btn-sm btn-{} mr-1" type="submit" '
+            'name="kind" value="{}">{} {}</button>',
+            style, kind, label, totals.get(kind, ''),
+        ))
+    parts.append('</form>')
+    return ''.join(parts)
+
+
+@register.simple_tag(takes_context=True)
+def comment_reactions(context, comment):
+    post = comment.post
+    return mark_safe(render_reactions(context, comment, cached_reverse(
+        context.get('request'), 'comment_react',
+        post.author.username, post.pk, comment.pk
+    )))
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    """
+    Карточка публикации, собранная без шаблонного движка.
+
+    Ссылки вычисляются один раз на запрос, а число комментариев берётся
+    из аннотации comments_count, если view её добавил. Реакции
+    показываются, если view подготовил их через attach_reactions.
+    """
+    request = context.get('request')
+    user = context.get('user')
+    username = post.author.username
+    parts = [
+        '<div class="card mb-3 mt-1 shadow-sm">',
+        render_thumbnail(post.image),
+        format_html(
+            '<div class="card-body"><p class="card-text">'
+            '<a name="post_{}" href="{}">'
+            '<strong class="d-block text-gray-dark">@{}</strong></a>'
+            '{}</p>',
+            post.id,
+            cached_reverse(request, 'profile', username),
+            post.author,
+            linebreaksbr(link_text(request, post.text)),
+        ),
+    ]
+    if post.group_id is not None:
+        parts.append(format_html(
+            '<a class="card-link muted" href="{}">'
+            '<strong class="d-block text-gray-dark">#{}</strong></a>',
+            cached_reverse(request, 'group', post.group.slug),
+            post.group.title,
+        ))
+    parts.append(
+        '<div class="d-flex justify-content-between align-items-center"><div>'
+    )
+    count = comments_count(post)
+    if count:
+        parts.append(format_html('<div>Комментариев: {}</div>', count))
+    if post.views:
+        parts.append(format_html('<div>Просмотров: {}</div>', post.views))
+    reactions = render_reactions(
+        context, post,
+        cached_reverse(request, 'post_react', username, post.id)
+    )
+    if reactions:
+        parts.append(f'<div class="mb-2">{reactions}</div>')
+    parts.append(format_html(
+        '<a class="btn btn-sm btn-primary" href="{}" role="button">'
+        'Добавить комментарий</a>',
+        reverse('post', args=(username, post.id)),
+    ))
+    if user is not None and user.id == post.author_id:
+        parts.append(format_html(
+            '<a class="btn btn-sm btn-info" href="{}" role="button">'
+            'Редактировать</a>'
+            '<a class="btn btn-sm btn-danger" href="{}" role="button">'
+            'Удалить пост</a>',
+            reverse('post_edit', args=(username, post.id)),
+            reverse('post_delete', args=(username, post.id)),
+        ))
+    parts.append(format_html(
+        '</div><small class="text-muted">{}</small></div></div></div>',
+        render_value_in_context(post.pub_date, context),
+    ))
+    return mark_safe(''.join(parts))
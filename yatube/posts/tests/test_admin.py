@@ -0,0 +1,109 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.admin import EstimatedCountPaginator
+from posts.models import Comment, Group, Post, User
+from posts.purge import soft_delete_post
+from posts.search import search_posts
+
+
+class AdminTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='secret'
+        )
+        self.client = Client()
+        self.client.force_login(self.admin)
+        self.group = Group.objects.create(
+            title='leo', slug='leo', description='leo'
+        )
+
+    def create_posts(self, count, text='post'):
+        for i in range(count):
+            post = Post.objects.create(
+                text=f'{text} {i}', author=self.admin, group=self.group
+            )
+            Comment.objects.create(post=post, author=self.admin, text='c')
+
+    def changelist_queries(self, name):
+        url = reverse(f'admin:posts_{name}_changelist')
+        with CaptureQueriesContext(connection) as context:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(context)
+
+    def test_changelists_do_not_query_per_row(self):
+        self.create_posts(2)
+        self.changelist_queries('post')
+        few = {
+            name: self.changelist_queries(name)
+            for name in ('post', 'comment')
+        }
+        self.create_posts(20)
+        for name, count in few.items():
+            with self.subTest(name=name):
+                self.assertEqual(self.changelist_queries(name), count)
+
+    def test_change_form_has_no_full_selects(self):
+        self.create_posts(1)
+        post = Post.objects.get()
+        response = self.client.get(
+            reverse('admin:posts_post_change', args=[post.pk])
+        )
+        self.assertNotContains(response, '<select name="author"')
+        self.assertContains(response, 'vForeignKeyRawIdAdminField')
+
+    def test_search_uses_index(self):
+        self.create_posts(2, text='Kanban board')
+        self.create_posts(1, text='unrelated #Agile')
+        url = reverse('admin:posts_post_changelist')
+        for term, found in (('kanb', 2), ('#agile', 1), ('nothing', 0)):
+            with self.subTest(term=term):
+                response = self.client.get(url, {'q': term})
+                self.assertEqual(
+                    response.context['cl'].result_count, found
+                )
+
+    def test_group_search_by_prefix(self):
+        Group.objects.create(
+            title='Kanban', slug='kanban', description='about leo'
+        )
+        url = reverse('admin:posts_group_changelist')
+        for term, found in (('kan', ['Kanban']), ('le', ['leo']),
+                            ('about', [])):
+            with self.subTest(term=term):
+                with CaptureQueriesContext(connection) as context:
+                    response = self.client.get(url, {'q': term})
+                groups = response.context['cl'].result_list
+                self.assertEqual([group.title for group in groups], found)
+                self.assertNotIn(
+                    ' LIKE ', ''.join(q['sql'] for q in context)
+                )
+
+    def test_index_follows_writes_without_signals(self):
+        """Скрытые посты уходят из индекса, bulk_create — после rebuild."""
+        self.create_posts(1, text='Kanban board')
+        soft_delete_post(Post.objects.get())
+        Post.objects.bulk_create([
+            Post(text='Kanban bulk', author=self.admin)
+        ])
+        found = search_posts(Post.all_objects.all(), 'kanban')
+        self.assertEqual(found.count(), 0)
+        call_command('rebuild_search', stdout=StringIO())
+        self.assertEqual(
+            [post.text for post in found.all()], ['Kanban bulk']
+        )
+
+    def test_paginator_caps_count(self):
+        self.create_posts(5)
+        queryset = Post.objects.order_by('pk')
+        paginator = EstimatedCountPaginator(queryset, 2)
+        paginator.exact_limit = 3
+        self.assertEqual(paginator.count, 3)
+        paginator = EstimatedCountPaginator(queryset, 2, estimate=True)
+        paginator.exact_limit = 3
+        self.assertEqual(paginator.count, 5)
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.core.cache import cache, caches
+from django.db import DatabaseError
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts import counters
+from posts.models import Post, User
+
+
+@override_settings(VIEW_FLUSH_INTERVAL=3600, VIEW_FLUSH_SIZE=1000)
+class ViewCounterTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        cache.clear()
+        caches['views'].clear()
+        counters.views.flush()
+        self.user = User.objects.create_user(username='TestUser')
+        self.post = Post.objects.create(text='Текст', author=self.user)
+        self.url = reverse('post', args=(self.user.username, self.post.pk))
+
+    def test_repeat_view_counted_once(self):
+        """Повторный просмотр того же посетителя не засчитывается."""
+        client = Client(HTTP_USER_AGENT='one')
+        client.get(self.url)
+        client.get(self.url)
+        Client(HTTP_USER_AGENT='two').get(self.url)
+        cache.clear()
+        client.get(self.url)
+        self.assertEqual(
+            counters.views.pending(), {self.post.pk: 2}
+        )
+        counters.views.flush()
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_flush_batches_updates(self):
+        """Один UPDATE на каждое различное приращение."""
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.user)
+            for i in range(6)
+        ]
+        for i, post in enumerate(posts):
+            for _ in range(i % 2 + 1):
+                counters.views.add(post.pk)
+        with self.assertNumQueries(2):
+            self.assertEqual(counters.views.flush(), 9)
+        self.assertEqual(
+            list(Post.objects.filter(
+                pk__in=[post.pk for post in posts]
+            ).order_by('pk').values_list('views', flat=True)),
+            [1, 2, 1, 2, 1, 2]
+        )
+
+    def test_flush_on_interval(self):
+        """Буфер сбрасывается сам, когда проходит интервал."""
+        buffer = counters.ViewBuffer()
+        buffer.add(self.post.pk, now=buffer._flushed_at + 1)
+        self.assertEqual(buffer.pending(), {self.post.pk: 1})
+        with self.settings(VIEW_FLUSH_INTERVAL=10):
+            buffer.add(self.post.pk, now=buffer._flushed_at + 11)
+        self.assertEqual(buffer.pending(), {})
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views, 2)
+
+    def test_failed_flush_keeps_views(self):
+        """При ошибке базы просмотры остаются в буфере."""
+        counters.views.add(self.post.pk)
+        with mock.patch.object(
+            Post.all_objects, 'filter', side_effect=DatabaseError
+        ):
+            self.assertEqual(counters.views.flush(), 0)
+        self.assertEqual(
+            counters.views.pending(), {self.post.pk: 1}
+        )
+        self.assertEqual(counters.views.flush(), 1)
@@ -0,0 +1,115 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ImageBlob, MediaCursor, Post, User
+from posts.tests.test_storage import SMALL_GIF
+
+OLD = 1000000000
+
+
+class MediaGCTests(TransactionTestCase):
+    databases = {'default', 'archive'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        shutil.rmtree(self.media_root, ignore_errors=True)
+        user = User.objects.create_user(username='TestUser')
+        self.post = Post.objects.create(
+            text='Test post',
+            author=user,
+            image=SimpleUploadedFile('small.gif', SMALL_GIF, 'image/gif')
+        )
+        self.thumbnail = self.make_thumbnail()
+        self.orphans = [
+            self.make_file('posts/00/00/' + '0' * 64 + '.gif', b'x' * 100),
+            self.make_file('posts/ff/tmp.upload', b'x' * 10),
+            self.make_file('cache/00/00/' + '0' * 32 + '.jpg', b'x' * 50),
+        ]
+        self.fresh = self.make_file('posts/11/11/new.gif', b'x')
+        for root, _, names in os.walk(self.media_root):
+            for name in names:
+                path = os.path.join(root, name)
+                if not path.endswith('new.gif'):
+                    os.utime(path, (OLD, OLD))
+
+    def make_thumbnail(self):
+        """Миниатюра поста, записанная в sorl так же, как get_thumbnail."""
+        source = ImageFile(self.post.image.name, self.post.image.storage)
+        default.kvstore.set(source)
+        name = self.make_file('cache/ab/cd/' + 'a' * 32 + '.gif', SMALL_GIF)
+        default.kvstore.set(ImageFile(name, default.storage), source)
+        return name
+
+    def make_file(self, name, content):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return name
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(self.media_root, name))
+
+    def gc(self, **options):
+        out = StringIO()
+        call_command('gc_media', pause=0, stdout=out, **options)
+        return out.getvalue()
+
+    def test_removes_only_unreachable_files(self):
+        out = self.gc()
+        self.assertIn('160 bytes reclaimed', out)
+        for name in self.orphans:
+            self.assertFalse(self.exists(name), name)
+        self.assertTrue(self.exists(self.post.image.name))
+        self.assertTrue(self.exists(self.thumbnail))
+        self.assertTrue(self.exists(self.fresh))
+
+    def test_resumes_from_cursor(self):
+        """Запуск с маленьким лимитом продолжает с места прошлого."""
+        out = self.gc(limit=1, batch_size=1)
+        self.assertIn('posts: 1 examined', out)
+        cursor = MediaCursor.objects.get(prefix='posts').cursor
+        self.assertEqual(cursor, self.orphans[0])
+        self.assertFalse(self.exists(self.orphans[0]))
+        self.assertTrue(self.exists(self.orphans[1]))
+        for _ in range(4):
+            self.gc(limit=1, batch_size=1)
+        for name in self.orphans:
+            self.assertFalse(self.exists(name), name)
+        self.assertEqual(MediaCursor.objects.get(prefix='posts').cursor, '')
+
+    def test_dry_run_keeps_files(self):
+        out = self.gc(dry_run=True)
+        self.assertIn('160 bytes reclaimed', out)
+        for name in self.orphans:
+            self.assertTrue(self.exists(name), name)
+
+    def test_orphan_original_takes_thumbnails(self):
+        """Картинка без поста удаляется вместе со своими миниатюрами."""
+        Post.all_objects.filter(pk=self.post.pk).update(image='')
+        ImageBlob.objects.filter(name=self.post.image.name).update(refs=0)
+        image, thumbnail = self.post.image.name, self.thumbnail
+        self.gc()
+        self.assertFalse(self.exists(image))
+        self.assertFalse(self.exists(thumbnail))
+        self.assertFalse(ImageBlob.objects.filter(name=image).exists())
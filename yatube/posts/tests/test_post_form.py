@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post, User
+
+
+class ManyGroupsTests(TestCase):
+    """Форма поста не должна зависеть от числа групп."""
+
+    GROUPS = 100000
+
+    @classmethod
+    def setUpTestData(cls):
+        Group.objects.bulk_create(
+            Group(title=f'Группа {i:06d}', slug=f'group-{i}', description='')
+            for i in range(cls.GROUPS)
+        )
+        cls.group = Group.objects.get(slug='group-777')
+        cls.user = User.objects.create_user(username='TestUser')
+        cls.post = Post.objects.create(
+            text='Test post', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.edit_url = reverse(
+            'post_edit', args=[self.user.username, self.post.pk]
+        )
+
+    def form_get(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotContains(response, '<option')
+        return response
+
+    def test_form_pages(self):
+        self.client.get(reverse('new_post'))
+        with self.assertNumQueries(0):
+            self.form_get(reverse('new_post'))
+        with self.assertNumQueries(2):
+            response = self.form_get(self.edit_url)
+        self.assertContains(response, 'value="Группа 000777"')
+
+    def test_invalid_group_value(self):
+        response = self.client.post(
+            reverse('new_post'), {'text': 'new', 'group': 'abc'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].errors)
+
+    def write_queries(self, url, data):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 302)
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE'))
+            and '"posts_post"' in query['sql']
+        ]
+
+    def test_new_post_single_insert(self):
+        writes = self.write_queries(
+            reverse('new_post'), {'text': 'new', 'group': self.group.pk}
+        )
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('INSERT'))
+
+    def test_post_edit_single_update(self):
+        writes = self.write_queries(
+            self.edit_url, {'text': 'edited', 'group': self.group.pk}
+        )
+        self.assertEqual(len(writes), 1)
+        self.assertTrue(writes[0].startswith('UPDATE'))
+
+    def test_autocomplete_cached_per_prefix(self):
+        url = reverse('group_autocomplete')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'q': 'группа 00077'})
+        titles = [group['title'] for group in response.json()['results']]
+        self.assertEqual(titles[0], 'Группа 000770')
+        self.assertEqual(len(titles), 10)
+        with self.assertNumQueries(0):
+            self.client.get(url, {'q': 'группа 00077'})
+        Group.objects.create(title='Группа 00077-new', slug='new')
+        with self.assertNumQueries(1):
+            response = self.client.get(url, {'q': 'group-77'})
+        slugs = [group['slug'] for group in response.json()['results']]
+        self.assertIn('group-77', slugs)
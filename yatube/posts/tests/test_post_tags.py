@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+
+
+class PostCardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.group = Group.objects.create(
+            title='leo',
+            slug='leo',
+            description='leo'
+        )
+        self.post = Post.objects.create(
+            text='Test <b>post</b>',
+            author=self.user,
+            group=self.group
+        )
+        Comment.objects.create(post=self.post, author=self.user, text='c')
+
+    def test_card_content(self):
+        """Карточка содержит ссылки, число комментариев, экранирует текст."""
+        response = self.authorized_client.get(reverse('index'))
+        content = response.content.decode()
+        self.assertIn(reverse('profile', args=[self.user.username]), content)
+        self.assertIn(reverse('group', args=[self.group.slug]), content)
+        self.assertIn(
+            reverse('post_edit', args=[self.user.username, self.post.pk]),
+            content
+        )
+        self.assertIn('Комментариев: 1', content)
+        self.assertIn('Test &lt;b&gt;post&lt;/b&gt;', content)
+
+    def test_feed_queries_do_not_grow(self):
+        """Число запросов ленты не зависит от количества постов."""
+        self.authorized_client.get(reverse('index'))
+        cache.clear()
+        with self.assertNumQueries(7):
+            self.authorized_client.get(reverse('index'))
+        for i in range(5):
+            Post.objects.create(text=f'post {i}', author=self.user)
+        cache.clear()
+        with self.assertNumQueries(7):
+            self.authorized_client.get(reverse('index'))
+
+    def test_links_in_text(self):
+        """Ссылки только на существующих; адреса не разбираются на теги."""
+        Post.objects.create(
+            text='@TestUser и @nobody, см. https://example.com/a#intro #go',
+            author=self.user
+        )
+        content = self.authorized_client.get(reverse('index')).content
+        content = content.decode()
+        self.assertIn(
+            f'<a href="{reverse("mentions", args=["TestUser"])}">', content
+        )
+        self.assertNotIn(reverse('mentions', args=['nobody']), content)
+        self.assertNotIn(reverse('tag', args=['intro']), content)
+        self.assertIn(reverse('tag', args=['go']), content)
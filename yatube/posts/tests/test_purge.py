@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from background.core import run_pending
+from notifications.models import Event
+from notifications.services import record, unread_count
+from posts.models import Comment, Follow, Post, TrendingPost, User
+from posts.purge import (purge_deleted, purge_user_content,
+                         schedule_user_deletion)
+from posts.reactions import attach_reactions, react
+
+
+class SoftDeleteTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.reader = User.objects.create_user(username='Uri')
+        self.client = Client()
+        self.client.force_login(self.user)
+        self.post = Post.objects.create(text='Test post', author=self.user)
+        Comment.objects.create(post=self.post, author=self.reader, text='c')
+
+    def test_deleted_post_hidden_then_purged(self):
+        """Пост скрывается сразу, а удаляется пачкой позже."""
+        self.client.get(
+            reverse('post_delete', args=[self.user.username, self.post.pk])
+        )
+        self.assertFalse(Post.objects.exists())
+        self.assertEqual(Post.all_objects.count(), 1)
+        response = self.client.get(
+            reverse('post', args=[self.user.username, self.post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(purge_deleted(batch_size=1), (1, 1))
+        self.assertFalse(Post.all_objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+
+    @override_settings(BACKGROUND_TASKS='memory')
+    def test_user_deletion_in_background(self):
+        Follow.objects.create(user=self.reader, author=self.user)
+        schedule_user_deletion(self.user)
+        self.assertFalse(self.user.posts.exists())
+        self.assertTrue(User.objects.filter(pk=self.user.pk).exists())
+        run_pending()
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(Comment.all_objects.exists())
+
+    def test_user_rows_removed_in_batches(self):
+        """Реакции, подписки и события удаляются до самого пользователя."""
+        other = Post.objects.create(text='Other post', author=self.reader)
+        react(self.user, other, 'like')
+        react(self.reader, other, 'like')
+        Follow.objects.create(user=self.user, author=self.reader)
+        record(Event.FOLLOW, self.reader, self.user)
+        self.assertEqual(unread_count(self.reader), 1)
+        purge_user_content(self.user.pk, batch_size=1)
+        self.assertFalse(User.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(
+            attach_reactions([other], None)[0].reaction_totals, {'like': 1}
+        )
+        self.assertFalse(Event.objects.exists())
+        self.assertEqual(unread_count(self.reader), 0)
+
+    @override_settings(BACKGROUND_TASKS='memory')
+    def test_trending_counts_follow_hidden_comments(self):
+        other = Post.objects.create(text='Other post', author=self.reader)
+        Comment.objects.create(post=other, author=self.user, text='c')
+        TrendingPost.objects.create(post=other, score=1, comments_count=1)
+        schedule_user_deletion(self.user)
+        self.assertEqual(TrendingPost.objects.get().comments_count, 0)
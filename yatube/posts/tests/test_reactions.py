@@ -0,0 +1,140 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import (Comment, CommentReactionCount, Post, Reaction,
+                          ReactionCount, User)
+from posts.reactions import attach_reactions, react, reconcile, unreact
+
+
+class ReactionTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='TestUser')
+        self.readers = [
+            User.objects.create_user(username=f'reader{i}') for i in range(5)
+        ]
+        self.post = Post.objects.create(text='Текст', author=self.author)
+        self.client = Client()
+        self.client.force_login(self.readers[0])
+
+    def totals(self, target):
+        return attach_reactions([target], None)[0].reaction_totals
+
+    def test_one_reaction_per_user(self):
+        """Повтор не меняет счётчик, смена реакции переносит единицу."""
+        for reader in self.readers:
+            self.assertTrue(react(reader, self.post, 'like'))
+        self.assertFalse(react(self.readers[0], self.post, 'like'))
+        self.assertTrue(react(self.readers[0], self.post, 'love'))
+        self.assertEqual(self.totals(self.post), {'like': 4, 'love': 1})
+        self.assertEqual(Reaction.objects.count(), 5)
+        self.assertTrue(unreact(self.readers[1], self.post))
+        self.assertFalse(unreact(self.readers[1], self.post))
+        self.assertEqual(self.totals(self.post), {'like': 3, 'love': 1})
+
+    def test_counts_spread_over_shards(self):
+        with self.settings(REACTION_SHARDS=4):
+            for reader in self.readers:
+                react(reader, self.post, 'like')
+        shards = ReactionCount.objects.filter(post=self.post)
+        self.assertLessEqual(shards.count(), 4)
+        self.assertEqual(sum(shard.count for shard in shards), 5)
+
+    def test_feed_state_in_one_query(self):
+        """Реакции страницы ленты читаются двумя запросами на всю страницу."""
+        posts = [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(10)
+        ]
+        for post in posts[::2]:
+            react(self.readers[0], post, 'laugh')
+            react(self.readers[1], post, 'like')
+        with self.assertNumQueries(2):
+            attach_reactions(posts, self.readers[0])
+        self.assertEqual(posts[0].my_reaction, 'laugh')
+        self.assertIsNone(posts[1].my_reaction)
+        self.assertEqual(posts[0].reaction_totals, {'laugh': 1, 'like': 1})
+
+    def test_toggle_view(self):
+        url = reverse('post_react', args=(self.author.username, self.post.pk))
+        next_url = reverse('index')
+        response = self.client.post(url, {'kind': 'like', 'next': next_url})
+        self.assertRedirects(response, next_url)
+        self.assertEqual(self.totals(self.post), {'like': 1})
+        response = self.client.get(reverse(
+            'post', args=(self.author.username, self.post.pk)
+        ))
+        self.assertContains(response, 'btn-primary mr-1')
+        self.client.post(url, {'kind': 'like'})
+        self.assertEqual(self.totals(self.post), {})
+        self.assertEqual(self.client.get(url).status_code, 405)
+
+    def test_comment_reactions(self):
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        url = reverse(
+            'comment_react',
+            args=(self.author.username, self.post.pk, comment.pk)
+        )
+        self.client.post(url, {'kind': 'love'})
+        self.assertEqual(self.totals(comment), {'love': 1})
+        response = self.client.get(reverse(
+            'post', args=(self.author.username, self.post.pk)
+        ))
+        self.assertContains(response, url)
+
+    def test_reconcile(self):
+        """Сверка исправляет расхождение и сворачивает шарды в один."""
+        for reader in self.readers:
+            react(reader, self.post, 'like')
+        ReactionCount.objects.filter(post=self.post).update(count=7)
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        CommentReactionCount.objects.create(
+            comment=comment, kind='like', shard=1, count=3
+        )
+        out = StringIO()
+        call_command('reconcile_reactions', stdout=out)
+        self.assertIn(
+            '1 post counters, 1 comment counters fixed', out.getvalue()
+        )
+        self.assertEqual(
+            list(ReactionCount.objects.values_list('shard', 'count')),
+            [(0, 5)]
+        )
+        self.assertFalse(CommentReactionCount.objects.exists())
+
+    def test_reconcile_in_batches(self):
+        """Цели сверяются пачками, и ни одна не теряется на границе."""
+        posts = [self.post] + [
+            Post.objects.create(text=f'Пост {i}', author=self.author)
+            for i in range(4)
+        ]
+        for post in posts:
+            react(self.readers[0], post, 'like')
+        ReactionCount.objects.update(count=2)
+        self.assertEqual(reconcile(Post, batch_size=2), 5)
+        self.assertEqual(
+            set(ReactionCount.objects.values_list('count', flat=True)), {1}
+        )
+
+    def test_deleted_user_leaves_counters(self):
+        """Удаление пользователя вычитает его реакции из счётчиков."""
+        comment = Comment.objects.create(
+            post=self.post, author=self.author, text='Комментарий'
+        )
+        for reader in self.readers[:3]:
+            react(reader, self.post, 'like')
+            react(reader, comment, 'love')
+        self.readers[0].delete()
+        self.assertEqual(self.totals(self.post), {'like': 2})
+        self.assertEqual(self.totals(comment), {'love': 2})
+        self.assertEqual(reconcile(Post) + reconcile(Comment), 0)
@@ -0,0 +1,88 @@
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from background.core import run_pending
+from posts.models import Follow, Suggestion, User
+from posts.recommendations import (IN_BATCH, SUGGESTIONS_PER_USER,
+                                   FollowGraph, rebuild_suggestions,
+                                   refresh_suggestions)
+
+
+class FollowGraphTests(TestCase):
+    def test_friend_of_friend_and_co_follow(self):
+        """Кандидаты через подписки и совместные подписки, без известных."""
+        graph = FollowGraph([(1, 2), (2, 3), (4, 2), (4, 5), (1, 6)])
+        suggested = dict(graph.suggest(1))
+        self.assertEqual(suggested, {3: 1.0, 5: 0.5})
+        self.assertEqual(graph.suggest(99), [])
+
+
+@override_settings(BACKGROUND_TASKS='memory')
+class SuggestionViewsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+        self.maxim = User.objects.create_user(username='Maxim')
+        self.uri = User.objects.create_user(username='Uri')
+        self.client = Client()
+        self.client.force_login(self.user)
+        Follow.objects.create(user=self.maxim, author=self.uri)
+
+    def test_follow_updates_suggestions_incrementally(self):
+        self.client.get(reverse('profile_follow', args=['Maxim']))
+        self.assertEqual(run_pending(), 1)
+        response = self.client.get(reverse('follow_index'))
+        authors = [s.author for s in response.context['suggestions']]
+        self.assertEqual(authors, [self.uri])
+        self.client.get(reverse('profile_unfollow', args=['Maxim']))
+        self.assertEqual(run_pending(), 1)
+        self.assertFalse(Suggestion.objects.filter(user=self.user).exists())
+
+    def test_follow_keeps_top_suggestions(self):
+        for i in range(SUGGESTIONS_PER_USER + 5):
+            author = User.objects.create_user(username=f'author{i}')
+            Follow.objects.create(user=self.maxim, author=author)
+        self.client.get(reverse('profile_follow', args=['Maxim']))
+        run_pending()
+        self.assertEqual(
+            Suggestion.objects.filter(user=self.user).count(),
+            SUGGESTIONS_PER_USER
+        )
+
+    def test_rebuild(self):
+        Follow.objects.create(user=self.user, author=self.maxim)
+        Suggestion.objects.create(user=self.user, author=self.maxim, score=9)
+        rebuild_suggestions()
+        self.assertQuerysetEqual(
+            Suggestion.objects.filter(user=self.user),
+            [repr(self.uri)],
+            transform=lambda suggestion: repr(suggestion.author)
+        )
+
+    def test_refresh_matches_rebuild(self):
+        """Пересчёт одного пользователя совпадает с полным, даже когда
+        подписок больше, чем параметров в одном IN."""
+        User.objects.bulk_create(
+            User(username=f'author{i}') for i in range(IN_BATCH + 20)
+        )
+        authors = list(
+            User.objects.filter(username__startswith='author').order_by('id')
+        )
+        Follow.objects.bulk_create(
+            Follow(user=self.user, author=author) for author in authors
+        )
+        Follow.objects.bulk_create(
+            Follow(user=author, author=authors[(i * 7) % len(authors)])
+            for i, author in enumerate(authors[:40])
+        )
+        Follow.objects.create(user=self.user, author=self.maxim)
+        Follow.objects.create(user=authors[3], author=self.uri)
+        refresh_suggestions(self.user.id)
+        refreshed = list(Suggestion.objects.filter(
+            user=self.user).order_by('-score', 'author_id').values_list(
+            'author_id', 'score'))
+        rebuild_suggestions()
+        rebuilt = list(Suggestion.objects.filter(
+            user=self.user).order_by('-score', 'author_id').values_list(
+            'author_id', 'score'))
+        self.assertEqual(refreshed, rebuilt)
+        self.assertEqual(rebuilt[0], (self.uri.id, 2.5))
@@ -0,0 +1,74 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TransactionTestCase, override_settings
+
+from posts.models import ImageBlob, Post, User
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x01\x00'
+    b'\x01\x00\x00\x00\x00\x21\xf9\x04'
+    b'\x01\x0a\x00\x01\x00\x2c\x00\x00'
+    b'\x00\x00\x01\x00\x01\x00\x00\x02'
+    b'\x02\x4c\x01\x00\x3b'
+)
+
+
+class ContentAddressedStorageTests(TransactionTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='TestUser')
+
+    def create_post(self, name='small.gif'):
+        return Post.objects.create(
+            text='Test post',
+            author=self.user,
+            image=SimpleUploadedFile(name, SMALL_GIF, 'image/gif')
+        )
+
+    def test_duplicates_share_one_file(self):
+        """Одинаковые картинки хранятся одним файлом с общим счётчиком."""
+        first = self.create_post('one.gif')
+        second = self.create_post('two.GIF')
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^posts/../../[0-9a-f]{64}\.gif$')
+        self.assertEqual(ImageBlob.objects.get().refs, 2)
+        files = [
+            f for _, _, names in os.walk(self.media_root) for f in names
+        ]
+        self.assertEqual(len(files), 1)
+
+    def test_file_removed_with_last_reference(self):
+        first = self.create_post()
+        second = self.create_post()
+        path = first.image.path
+        first.delete()
+        self.assertTrue(os.path.exists(path))
+        second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_file_kept_when_reused_before_commit(self):
+        """Картинку снова загрузили, пока удаление ждало коммита."""
+        post = self.create_post()
+        path = post.image.path
+        with transaction.atomic():
+            post.delete()
+            self.create_post()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(ImageBlob.objects.get().refs, 1)
@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts import views
+from posts.models import Mention, Post, PostTag, Tag, User
+from posts.tags import extract_mentions, extract_tags
+
+
+class TagIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.reader = User.objects.create_user(username='Uri')
+        self.client = Client()
+
+    def test_extract(self):
+        text = 'Привет, @Uri. #Django и #django, а ещё a#b и mail@x'
+        self.assertEqual(extract_tags(text), {'django'})
+        self.assertEqual(extract_mentions(text), {'Uri'})
+        self.assertEqual(extract_tags('https://x.org/#faq #go'), {'go'})
+
+    def test_index_follows_text(self):
+        """Индекс обновляется при создании и правке поста."""
+        post = Post.objects.create(
+            text='#python для @Uri', author=self.user
+        )
+        self.assertEqual(
+            list(post.tag_links.values_list('tag__name', flat=True)),
+            ['python']
+        )
+        self.assertTrue(Mention.objects.filter(
+            post=post, user=self.reader
+        ).exists())
+        post.text = '#go'
+        post.save()
+        self.assertEqual(
+            list(post.tag_links.values_list('tag__name', flat=True)), ['go']
+        )
+        self.assertFalse(Mention.objects.exists())
+
+    def test_tag_feed_keyset(self):
+        posts = [
+            Post.objects.create(text=f'#news {i}', author=self.user)
+            for i in range(views.TAG_PAGE_SIZE + 2)
+        ]
+        Post.objects.create(text='без тегов', author=self.user)
+        response = self.client.get(reverse('tag', args=['News']))
+        page = response.context['post_list']
+        self.assertEqual(page[0], posts[-1])
+        self.assertEqual(len(page), views.TAG_PAGE_SIZE)
+        cursor = response.context['next_cursor']
+        self.assertContains(response, f'?before={cursor}')
+        tag_url = reverse('tag', args=['news'])
+        self.assertContains(response, f'href="{tag_url}"')
+        response = self.client.get(
+            reverse('tag', args=['news']), {'before': cursor}
+        )
+        self.assertEqual(response.context['post_list'], posts[1::-1])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_mentions_feed(self):
+        post = Post.objects.create(text='Спасибо, @Uri!', author=self.user)
+        response = self.client.get(
+            reverse('mentions', args=[self.reader.username])
+        )
+        self.assertEqual(response.context['post_list'], [post])
+
+    def test_backfill(self):
+        Post.objects.create(text='#old', author=self.user)
+        Post.objects.create(text='#old @Uri', author=self.user)
+        PostTag.objects.all().delete()
+        Mention.objects.all().delete()
+        call_command('backfill_tags', chunk_size=1, stdout=StringIO())
+        self.assertEqual(Tag.objects.get(name='old').post_links.count(), 2)
+        self.assertEqual(Mention.objects.count(), 1)
@@ -0,0 +1,57 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Comment, Group, Post, TrendingGroup, User
+from posts.trending import compute_scores, update_trending
+
+
+class TrendingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.group = Group.objects.create(
+            title='leo',
+            slug='leo',
+            description='leo'
+        )
+        self.quiet = Post.objects.create(text='quiet', author=self.user)
+        self.popular = Post.objects.create(
+            text='popular',
+            author=self.user,
+            group=self.group
+        )
+        for i in range(3):
+            Comment.objects.create(
+                post=self.popular,
+                author=self.user,
+                text=str(i)
+            )
+
+    def test_scores_decay(self):
+        """Со временем балл падает, за пределами окна пост не учитывается."""
+        now = timezone.now()
+        fresh, _ = compute_scores(now)
+        later, _ = compute_scores(now + timedelta(hours=12))
+        self.assertGreater(fresh[self.popular.pk], fresh[self.quiet.pk])
+        self.assertAlmostEqual(
+            later[self.popular.pk],
+            fresh[self.popular.pk] / 2,
+            places=2
+        )
+        expired, _ = compute_scores(now + timedelta(days=30))
+        self.assertEqual(dict(expired), {})
+
+    def test_trending_page(self):
+        update_trending()
+        self.assertEqual(TrendingGroup.objects.get().group, self.group)
+        with self.assertNumQueries(2):
+            response = Client().get(reverse('trending'))
+        self.assertEqual(
+            response.context['post_list'],
+            [self.popular, self.quiet]
+        )
+        self.assertEqual(response.context['post_list'][0].comments_count, 3)
@@ -410,3 +410,54 @@ class PostPagesTests(TestCase):
             F'/{self.user_maxim.username}/unfollow/' 
         ) 
         self.assertEqual(Follow.objects.count(), count_following - 1)
+
+
+class FollowListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = User.objects.create_user(username='Maxim')
+        self.client = Client()
+        self.client.force_login(self.author)
+        self.followers = [
+            User.objects.create_user(
+                username=f'reader{i}',
+                first_name='Имя',
+                last_name=str(i)
+            )
+            for i in range(60)
+        ]
+        Follow.objects.bulk_create(
+            Follow(user=user, author=self.author) for user in self.followers
+        )
+
+    def test_followers_keyset_pages(self):
+        """Подписчики отдаются страницами по курсору без повторов."""
+        url = reverse('following', kwargs={'username': self.author.username})
+        with self.assertNumQueries(6):
+            response = self.client.get(url)
+        people = response.context['people']
+        self.assertEqual(len(people), 50)
+        self.assertEqual(people[0]['username'], 'reader59')
+        self.assertEqual(people[0]['full_name'], 'Имя 59')
+        cursor = response.context['next_cursor']
+        response = self.client.get(url, {'after': cursor})
+        self.assertEqual(len(response.context['people']), 10)
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_following_json(self):
+        url = reverse(
+            'followers',
+            kwargs={'username': self.followers[0].username}
+        )
+        response = self.client.get(url, {'format': 'json'})
+        self.assertEqual(
+            response.json(),
+            {
+                'results': [{
+                    'id': Follow.objects.get(user=self.followers[0]).id,
+                    'username': 'Maxim',
+                    'full_name': '',
+                }],
+                'next': None,
+            }
+        )
@@ -0,0 +1,126 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Comment, Follow, Post, TrendingGroup, TrendingPost
+
+COMMENT_WEIGHT = 3.0
+FOLLOW_WEIGHT = 1.0
+POST_WEIGHT = 1.0
+TRENDING_SIZE = 100
+
+
+def decay_weights(times, now, half_life):
+    """Вес каждого события: 1 сейчас, 0.5 через half_life и т.д."""
+    rate = math.log(2) / half_life.total_seconds()
+    return [
+        math.exp(-rate * (now - moment).total_seconds()) for moment in times
+    ]
+
+
+def accumulate(scores, keys, times, now, half_life, weight):
+    for key, value in zip(keys, decay_weights(times, now, half_life)):
+        scores[key] += weight * value
+
+
+def compute_scores(now=None):
+    """
+    Считает затухающие баллы постов и групп за последнее окно.
+
+    Каждый источник читается одним запросом values_list по индексу
+    даты, а баллы складываются пакетно по столбцам, без объектов моделей.
+    """
+    now = now or timezone.now()
+    window = timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    half_life = timedelta(hours=settings.TRENDING_HALF_LIFE_HOURS)
+    since = now - window
+
+    posts = list(Post.objects.filter(pub_date__gte=since).values_list(
+        'id', 'author_id', 'group_id', 'pub_date'
+    ))
+    post_ids, authors, groups, dates = (
+        zip(*posts) if posts else ((), (), (), ())
+    )
+    post_scores = defaultdict(float)
+    accumulate(post_scores, post_ids, dates, now, half_life, POST_WEIGHT)
+
+    comments = Comment.objects.filter(
+        created__gte=since, post__pub_date__gte=since
+    ).values_list('post_id', 'created')
+    if comments:
+        comment_posts, comment_dates = zip(*comments)
+        accumulate(
+            post_scores, comment_posts, comment_dates,
+            now, half_life, COMMENT_WEIGHT
+        )
+
+    follows = Follow.objects.filter(
+        created__gte=since, author_id__in=set(authors)
+    ).values_list('author_id', 'created')
+    author_scores = defaultdict(float)
+    if follows:
+        follow_authors, follow_dates = zip(*follows)
+        accumulate(
+            author_scores, follow_authors, follow_dates,
+            now, half_life, FOLLOW_WEIGHT
+        )
+    for post_id, author_id in zip(post_ids, authors):
+        post_scores[post_id] += author_scores.get(author_id, 0.0)
+
+    group_scores = defaultdict(float)
+    for post_id, group_id in zip(post_ids, groups):
+        if group_id is not None:
+            group_scores[group_id] += post_scores[post_id]
+    return post_scores, group_scores
+
+
+def top(scores, size=TRENDING_SIZE):
+    return sorted(
+        scores.items(), key=lambda item: item[1], reverse=True
+    )[:size]
+
+
+def update_trending(now=None):
+    """Пересчитывает рейтинги и атомарно подменяет сохранённые списки."""
+    post_scores, group_scores = compute_scores(now)
+    posts = top(post_scores)
+    comments = dict(Comment.objects.filter(
+        post_id__in=[post_id for post_id, _ in posts]
+    ).values('post_id').annotate(total=Count('pk')).order_by().values_list(
+        'post_id', 'total'
+    ))
+    with transaction.atomic():
+        TrendingPost.objects.all().delete()
+        TrendingPost.objects.bulk_create(
+            TrendingPost(
+                post_id=post_id,
+                score=score,
+                comments_count=comments.get(post_id, 0)
+            )
+            for post_id, score in posts
+        )
+        TrendingGroup.objects.all().delete()
+        TrendingGroup.objects.bulk_create(
+            TrendingGroup(group_id=group_id, score=score)
+            for group_id, score in top(group_scores)
+        )
+    return len(post_scores), len(group_scores)
+
+
+def refresh_comment_counts():
+    """
+    Пересчитывает comments_count сохранённых трендов, когда комментарии
+    скрыли между запусками update_trending.
+    """
+    visible = Comment.objects.filter(post=OuterRef('post')).values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    TrendingPost.objects.update(comments_count=Coalesce(
+        Subquery(visible, output_field=IntegerField()), 0
+    ))
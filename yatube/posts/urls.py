@@ -7,10 +7,18 @@ urlpatterns = [
     path('group/<slug:slug>/', views.group_posts, name='group'),
     path('new/', views.new_post, name='new_post'),
     path('new_group/', views.new_group, name='new_group'),
+    path(
+        'groups/autocomplete/',
+        views.group_autocomplete,
+        name='group_autocomplete'
+    ),
     path('follow/', views.follow_index, name="follow_index"),
+    path('trending/', views.trending, name='trending'),
+    path('tag/<str:name>/', views.tag_posts, name='tag'),
     path('<str:username>/', views.profile, name='profile'),
     path('<str:username>/following/', views.following_author, name='following'),
     path('<str:username>/followers/', views.follower_author, name='followers'),
+    path('<str:username>/mentions/', views.mentions, name='mentions'),
     path('<str:username>/<int:post_id>/', views.post_view, name='post'),
     path(
         '<str:username>/<int:post_id>/edit/',
@@ -27,6 +35,16 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        '<str:username>/<int:post_id>/react/',
+        views.post_react,
+        name='post_react'
+    ),
+    path(
+        '<str:username>/<int:post_id>/comment/<int:comment_id>/react/',
+        views.comment_react,
+        name='comment_react'
+    ),
     path(
         '<str:username>/follow/',
         views.profile_follow,
@@ -1,33 +1,131 @@
 from django.contrib.auth.decorators import login_required 
 from django.core.paginator import Paginator 
-from django.shortcuts import (get_list_or_404, get_object_or_404, redirect, 
-                              render) 
+from django.db.models import Count, Q
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import is_safe_url
 from django.views.decorators.cache import cache_page 
+from django.views.decorators.http import require_POST
  
+from archive.store import get_archived_post
+from notifications.models import Event
+from notifications.services import record
+from yatube.edge import POSTS_KEY, add_surrogate_keys, edge_cache, key
+from yatube.ratelimit import ratelimit
+from yatube.streaming import render_stream
+
+from .autocomplete import search_groups
+from .counters import record_view
 from .forms import CommentForm, PostForm, GroupForm
-from .models import Follow, Group, Post, User 
+from .models import (Comment, Follow, Group, Post, Tag, TrendingGroup,
+                     TrendingPost, User)
+from .purge import soft_delete_post
+from .reactions import KINDS, attach_reactions, react, unreact
+from .recommendations import suggestions_for
+from .tasks import update_suggestions
  
  
+def feed(post_list):
+    """Подгружает всё, что нужно карточке поста, одним запросом."""
+    return post_list.select_related('author', 'group').annotate(
+        comments_count=Count('comments', filter=Q(comments__is_deleted=False))
+    )
+
+
+def page_keys(request, page, *keys):
+    """Ключи прокси для страницы ленты: сама лента и каждый пост."""
+    post_keys = [key('post', post.pk) for post in page]
+    add_surrogate_keys(request, *keys, *post_keys)
+
+
 @cache_page(1 * 2) 
+@edge_cache
 def index(request): 
-    post_list = get_list_or_404(Post) 
+    post_list = feed(Post.objects.all())
     paginator = Paginator(post_list, 10) 
     page_number = request.GET.get('page') 
     page = paginator.get_page(page_number) 
+    page_keys(request, page, POSTS_KEY)
+    attach_reactions(page, request.user)
     return render(request, 'index.html', { 
         'page': page, 
         'paginator': paginator, 
     }) 
  
  
+@cache_page(1 * 2)
+def trending(request):
+    trends = TrendingPost.objects.filter(
+        post__is_deleted=False
+    ).select_related('post__author', 'post__group')[:10]
+    post_list = []
+    for trend in trends:
+        trend.post.comments_count = trend.comments_count
+        post_list.append(trend.post)
+    groups = TrendingGroup.objects.select_related('group')[:10]
+    context = {
+        'post_list': post_list,
+        'groups': groups,
+    }
+    return render(request, 'trending.html', context)
+
+
+TAG_PAGE_SIZE = 10
+
+
+def keyset_page(request, post_list):
+    """Страница ленты по курсору ?before=<id> без OFFSET и COUNT."""
+    before = request.GET.get('before', '')
+    if before.isdigit():
+        post_list = post_list.filter(pk__lt=int(before))
+    posts = list(feed(post_list).order_by('-pk')[:TAG_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(posts) > TAG_PAGE_SIZE:
+        posts = posts[:TAG_PAGE_SIZE]
+        next_cursor = posts[-1].pk
+    return posts, next_cursor
+
+
+@cache_page(1 * 2)
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    post_list, next_cursor = keyset_page(
+        request, Post.objects.filter(tag_links__tag=tag)
+    )
+    context = {
+        'title': f'#{tag.name}',
+        'post_list': post_list,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'tagged.html', context)
+
+
+@cache_page(1 * 2)
+def mentions(request, username):
+    profile = get_object_or_404(User, username=username)
+    post_list, next_cursor = keyset_page(
+        request, Post.objects.filter(mentions__user=profile)
+    )
+    context = {
+        'title': f'Упоминания @{profile.username}',
+        'post_list': post_list,
+        'next_cursor': next_cursor,
+    }
+    return render(request, 'tagged.html', context)
+
+
 @cache_page(1 * 2) 
+@edge_cache
 def group_posts(request, slug): 
     group = get_object_or_404(Group, slug=slug) 
-    post_list = group.posts.all() 
+    post_list = feed(group.posts.all())
     paginator = Paginator(post_list, 10) 
     page_number = request.GET.get('page') 
     page = paginator.get_page(page_number) 
-    posts_count = post_list.count() 
+    page_keys(request, page, key('group', group.slug))
+    attach_reactions(page, request.user)
+    posts_count = paginator.count
     context = { 
         'group': group, 
         'page': page, 
@@ -38,14 +136,14 @@ def group_posts(request, slug):
  
  
 @login_required 
+@ratelimit('10/m')
 def new_post(request): 
-    commit = False 
     form = PostForm(request.POST or None, files=request.FILES or None) 
     if request.method == 'POST' and form.is_valid(): 
-        form.save(commit).author = request.user 
-        form.save() 
+        post = form.save(commit=False)
+        post.author = request.user
+        post.save()
         return redirect('index') 
-    form = PostForm() 
     button = 'Создать новую запись' 
     title = 'Новая запись' 
     header = 'Создание новой записи' 
@@ -57,6 +155,14 @@ def new_post(request):
     } 
     return render(request, "form.html", context) 
  
+
+def group_autocomplete(request):
+    prefix = request.GET.get('q', '').strip()[:100]
+    results = search_groups(prefix) if prefix else []
+    return JsonResponse({'results': results})
+
+
+@ratelimit('5/m')
 def new_group(request):
     form = GroupForm(request.POST or None)
     if request.method == 'POST' and form.is_valid():
@@ -75,36 +181,65 @@ def new_group(request):
     return render(request, "form.html", context)
 
  
+@edge_cache
 def profile(request, username): 
     profile = get_object_or_404(User, username=username) 
-    post_list = profile.posts.all() 
-    posts_count = post_list.count() 
-    paginator = Paginator(post_list, 10) 
-    page_number = request.GET.get('page') 
-    page = paginator.get_page(page_number) 
+    # Пост автора очищает у прокси и его профиль, поэтому ключей
+    # постов страницы не нужно: лента читается уже в блоке content.
+    add_surrogate_keys(request, key('user', profile.username))
+
+    def profile_page():
+        paginator = Paginator(feed(profile.posts.all()), 10)
+        page = paginator.get_page(request.GET.get('page'))
+        attach_reactions(page, request.user)
+        return page
+
+    page = SimpleLazyObject(profile_page)
     following = False 
     if request.user.is_authenticated: 
         following = Follow.objects.filter( 
             user=request.user, 
             author=profile.id 
         ).exists() 
+    suggestions = ()
+    if request.user == profile:
+        suggestions = SimpleLazyObject(lambda: suggestions_for(request.user))
+    # Лента, число постов, реакции и подсказки считаются в блоке
+    # content, когда шапка уже у клиента.
     context = { 
         'profile': profile, 
-        'post_list': post_list, 
-        'posts_count': posts_count, 
+        'posts_count': SimpleLazyObject(lambda: page.paginator.count),
         'page': page, 
-        'paginator': paginator, 
+        'paginator': SimpleLazyObject(lambda: page.paginator),
         'following': following, 
+        'suggestions': suggestions,
     } 
-    return render(request, 'profile.html', context)
+    return render_stream(request, 'profile.html', context)
 
 
+@edge_cache
 def post_view(request, username, post_id): 
-    post_list = get_object_or_404(Post, pk=post_id, author__username=username) 
+    post_list = feed(Post.objects.all()).filter(
+        pk=post_id, author__username=username
+    ).first()
+    if post_list is None:
+        post_list, comment_list = get_archived_post(post_id, username)
+        if post_list is None:
+            raise Http404('Запись не найдена')
+    else:
+        # Комментарии читаются в блоке content, когда шапка уже
+        # у клиента.
+        comment_list = SimpleLazyObject(lambda: attach_reactions(
+            post_list.comments.select_related('author'), request.user
+        ))
+        attach_reactions([post_list], request.user)
+        record_view(request, post_list)
     profile = post_list.author
+    add_surrogate_keys(
+        request, key('post', post_list.pk), key('user', profile.username)
+    )
 
     form = CommentForm() 
-    comment_list = post_list.comments.all() 
     following = False 
     if request.user.is_authenticated: 
         following = Follow.objects.filter( 
@@ -118,12 +253,16 @@ def post_view(request, username, post_id):
         'comment_list': comment_list, 
         'following': following, 
     } 
-    return render(request, 'post.html', context) 
+    return render_stream(request, 'post.html', context)
  
  
 @login_required 
 def post_edit(request, username, post_id): 
-    post = get_object_or_404(Post, pk=post_id, author__username=username) 
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        pk=post_id,
+        author__username=username
+    )
     profile = post.author 
     if request.user != profile: 
         return redirect('post', username=profile.username, post_id=post_id) 
@@ -152,11 +291,49 @@ def post_delete(request, username, post_id):
     post = get_object_or_404(Post, pk=post_id, author__username=username)
     if request.user != post.author:
         return redirect('index')
-    post.delete()
+    soft_delete_post(post)
     return redirect('index')
 
 
+def toggle_reaction(request, target):
+    """Ставит выбранную реакцию, а повторное нажатие снимает её."""
+    kind = request.POST.get('kind')
+    if kind in KINDS and not react(request.user, target, kind):
+        unreact(request.user, target)
+    next_url = request.POST.get('next')
+    if next_url and is_safe_url(next_url, {request.get_host()}):
+        return redirect(next_url)
+    post = target if isinstance(target, Post) else target.post
+    return redirect('post', username=post.author.username, post_id=post.pk)
+
+
+@login_required
+@require_POST
+@ratelimit('60/m')
+def post_react(request, username, post_id):
+    post = get_object_or_404(
+        Post.objects.select_related('author'),
+        pk=post_id,
+        author__username=username
+    )
+    return toggle_reaction(request, post)
+
+
+@login_required
+@require_POST
+@ratelimit('60/m', scope='post_react')
+def comment_react(request, username, post_id, comment_id):
+    comment = get_object_or_404(
+        Comment.objects.select_related('post__author'),
+        pk=comment_id,
+        post_id=post_id,
+        post__author__username=username
+    )
+    return toggle_reaction(request, comment)
+
+
 @login_required 
+@ratelimit('20/m')
 def add_comment(request, username, post_id): 
     post = get_object_or_404(Post, pk=post_id, author__username=username) 
     form = CommentForm(request.POST or None) 
@@ -165,60 +342,115 @@ def add_comment(request, username, post_id):
         comment.author = request.user 
         comment.post = post 
         comment.save() 
+        record(Event.COMMENT, post.author, request.user, post)
     return redirect("post", username=username, post_id=post_id) 
  
  
 @login_required 
 def follow_index(request): 
-    post_list = Post.objects.filter(author__following__user=request.user) 
+    post_list = feed(
+        Post.objects.filter(author__following__user=request.user)
+    )
     paginator = Paginator(post_list, 10) 
     page_number = request.GET.get('page') 
     page = paginator.get_page(page_number) 
+    attach_reactions(page, request.user)
     context = { 
         'paginator': paginator, 
-        'page': page 
+        'page': page,
+        'suggestions': suggestions_for(request.user),
     } 
     return render(request, "follow.html", context)
 
-@login_required
-def following_author(request, username):
+
+FOLLOW_PAGE_SIZE = 50
+
+
+def follow_page(request, follows, related):
+    """
+    Страница списка подписок с пагинацией по ключу: ?after=<id>.
+
+    Вместо OFFSET берутся строки с id меньше курсора, а вместо объектов
+    User — только нужные поля, поэтому стоимость страницы не зависит
+    от её номера и числа подписчиков.
+    """
+    after = request.GET.get('after', '')
+    if after.isdigit():
+        follows = follows.filter(id__lt=int(after))
+    rows = follows.order_by('-id').values(
+        'id',
+        f'{related}__username',
+        f'{related}__first_name',
+        f'{related}__last_name',
+    )[:FOLLOW_PAGE_SIZE + 1]
+    people = [
+        {
+            'id': row['id'],
+            'username': row[f'{related}__username'],
+            'full_name': '{} {}'.format(
+                row[f'{related}__first_name'],
+                row[f'{related}__last_name']
+            ).strip(),
+        }
+        for row in rows
+    ]
+    next_cursor = None
+    if len(people) > FOLLOW_PAGE_SIZE:
+        people = people[:FOLLOW_PAGE_SIZE]
+        next_cursor = people[-1]['id']
+    return people, next_cursor
+
+
+def follow_list(request, username, template, field, related):
     profile = get_object_or_404(User, username=username)
-    following = Follow.objects.filter(  
-        author=profile.id
-    )
+    follows = Follow.objects.filter(**{field: profile})
+    people, next_cursor = follow_page(request, follows, related)
+    if request.GET.get('format') == 'json':
+        return JsonResponse({'results': people, 'next': next_cursor})
     context = {
-        'following': following,
+        'people': people,
+        'next_cursor': next_cursor,
         'profile': profile
     }
-    return render(request, 'following_author.html', context)
+    return render(request, template, context)
+
+
+@login_required
+def following_author(request, username):
+    return follow_list(
+        request, username, 'following_author.html', 'author', 'user'
+    )
 
 
 @login_required
 def follower_author(request, username):
-    profile = get_object_or_404(User, username=username)
-    following = Follow.objects.filter(  
-        user=profile.id
+    return follow_list(
+        request, username, 'followers_author.html', 'user', 'author'
     )
-    context = {
-        'following': following,
-        'profile': profile
-    }
-    return render(request, 'followers_author.html', context)
 
-    
- 
+
 @login_required 
+@ratelimit('30/m', methods=None)
 def profile_follow(request, username): 
     author = get_object_or_404(User, username=username) 
     if author.username != request.user.username: 
-        Follow.objects.get_or_create(user=request.user, author=author) 
+        _, created = Follow.objects.get_or_create(
+            user=request.user, author=author
+        )
+        if created:
+            update_suggestions.delay(user_id=request.user.id)
+            record(Event.FOLLOW, author, request.user)
     return redirect("profile", username=username) 
  
  
 @login_required 
 def profile_unfollow(request, username): 
     author = get_object_or_404(User, username=username) 
-    Follow.objects.filter(user=request.user, author=author).delete() 
+    deleted, _ = Follow.objects.filter(
+        user=request.user, author=author
+    ).delete()
+    if deleted:
+        update_suggestions.delay(user_id=request.user.id)
     return redirect("profile", username=username) 
  
  
@@ -0,0 +1,29 @@
+from django import forms
+from django.urls import reverse
+
+from .models import Group
+
+
+class GroupAutocomplete(forms.Widget):
+    """
+    Поле выбора группы с подсказками с сервера.
+
+    В форму уходит id группы из скрытого поля, а на странице
+    показывается только название выбранной группы, а не весь список.
+    """
+
+    template_name = 'widgets/group_autocomplete.html'
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        title = ''
+        # При невалидной форме сюда приходит сырая строка из запроса.
+        if value and str(value).isdigit():
+            title = Group.objects.filter(pk=value).values_list(
+                'title', flat=True
+            ).first() or ''
+        context['widget'].update(
+            title=title,
+            url=reverse('group_autocomplete'),
+        )
+        return context
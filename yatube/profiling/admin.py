@@ -0,0 +1,24 @@
+from django.contrib import admin
+
+from .models import Profile, SlowQuery
+
+
+class ProfileAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk', 'method', 'path', 'view_name', 'status', 'duration',
+        'query_count', 'trigger', 'created'
+    )
+    list_filter = ('trigger', 'view_name')
+    raw_id_fields = ('user',)
+    exclude = ('stats',)
+
+
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'query', 'count', 'total_time', 'max_time', 'view_name', 'last_seen'
+    )
+    search_fields = ('fingerprint', 'view_name')
+
+
+admin.site.register(Profile, ProfileAdmin)
+admin.site.register(SlowQuery, SlowQueryAdmin)
@@ -0,0 +1,18 @@
+from django.apps import AppConfig
+
+
+class ProfilingConfig(AppConfig):
+    name = 'profiling'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from background.signals import task_finished, task_started
+
+        from . import slowlog
+
+        connection_created.connect(slowlog.install)
+        # Запросы фоновых задач подписываются именем задачи и пишутся
+        # после каждой пачки, а не только в конце запроса.
+        task_started.connect(slowlog.task_started)
+        task_finished.connect(slowlog.task_finished)
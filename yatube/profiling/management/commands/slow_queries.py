@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from profiling.models import SlowQuery
+from profiling.slowlog import full_scans
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает самые затратные запросы из журнала медленных '
+        'запросов и таблицы, которые они читают без индекса.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=20)
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Очистить журнал после отчёта.'
+        )
+
+    def handle(self, *args, **options):
+        for item in SlowQuery.objects.all()[:options['limit']]:
+            self.stdout.write(
+                f'{item.total_time:10.1f} ms total, {item.count} calls, '
+                f'avg {item.total_time / item.count:.1f} ms, '
+                f'max {item.max_time:.1f} ms'
+            )
+            self.stdout.write(f'  view: {item.view_name or "-"}')
+            self.stdout.write(f'  origin: {item.origin or "-"}')
+            if item.template:
+                self.stdout.write(f'  template: {item.template}')
+            self.stdout.write(f'  {item.query}')
+            for line in item.plan.splitlines():
+                self.stdout.write(f'    | {line}')
+            for table in full_scans(item.plan):
+                self.stdout.write(self.style.WARNING(
+                    f'  full scan of {table}: index may be missing'
+                ))
+            self.stdout.write('')
+        if options['reset']:
+            SlowQuery.objects.all().delete()
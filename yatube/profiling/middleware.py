@@ -0,0 +1,161 @@
+import cProfile
+import json
+import marshal
+import pstats
+import random
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+from . import slowlog
+from .models import Profile
+
+MAX_QUERIES = 500
+
+
+class QueryRecorder:
+    """execute_wrapper, записывающий SQL и время каждого запроса."""
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            if len(self.queries) < MAX_QUERIES:
+                self.queries.append({
+                    'alias': context['connection'].alias,
+                    'sql': sql,
+                    'time': (time.perf_counter() - started) * 1000,
+                })
+
+
+@contextmanager
+def measure(profiler, recorder):
+    """Включает профайлер и запись SQL на всех соединениях."""
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+
+
+def profile_trigger(request):
+    header = getattr(settings, 'PROFILING_HEADER', 'HTTP_X_PROFILE')
+    if request.META.get(header) and request.user.is_staff:
+        return Profile.HEADER
+    rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+    if rate and random.random() < rate:
+        return Profile.SAMPLE
+    return None
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует часть запросов через cProfile.
+
+    Запрос попадает в профиль с вероятностью PROFILING_SAMPLE_RATE
+    или по заголовку X-Profile от сотрудника. Остальные запросы
+    проходят без накладных расходов, кроме одного вызова random().
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        trigger = profile_trigger(request)
+        if trigger is None:
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        profiler = cProfile.Profile()
+        started = time.perf_counter()
+        with measure(profiler, recorder):
+            response = self.get_response(request)
+        profile = self.save(
+            request, response, trigger, started, profiler, recorder
+        )
+        if response.streaming:
+            # Тело потокового ответа рендерится уже после view: профиль
+            # создаётся сразу ради заголовка и дописывается в конце.
+            response.streaming_content = self.stream(
+                response.streaming_content, profile,
+                started, profiler, recorder
+            )
+        return response
+
+    def stream(self, content, profile, started, profiler, recorder):
+        try:
+            with measure(profiler, recorder):
+                yield from content
+        finally:
+            Profile.objects.filter(pk=profile.pk).update(
+                **self.results(started, profiler, recorder)
+            )
+
+    def results(self, started, profiler, recorder):
+        return {
+            'duration': (time.perf_counter() - started) * 1000,
+            'query_count': recorder.count,
+            'queries': json.dumps(recorder.queries),
+            'stats': marshal.dumps(pstats.Stats(profiler).stats),
+        }
+
+    def save(self, request, response, trigger, started, profiler, recorder):
+        match = getattr(request, 'resolver_match', None)
+        user = getattr(request, 'user', None)
+        profile = Profile.objects.create(
+            method=request.method,
+            path=request.get_full_path()[:500],
+            view_name=match.view_name if match else '',
+            status=response.status_code,
+            trigger=trigger,
+            user=user if user is not None and user.is_authenticated else None,
+            **self.results(started, profiler, recorder)
+        )
+        keep = getattr(settings, 'PROFILING_KEEP', 200)
+        Profile.objects.filter(pk__lte=profile.pk - keep).delete()
+        if trigger == Profile.HEADER:
+            response['X-Profile-Id'] = str(profile.pk)
+        return profile
+
+
+class SlowQueryMiddleware:
+    """Подписывает медленные запросы именем view и сохраняет их."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        except Exception:
+            slowlog.finish()
+            raise
+        if response.streaming:
+            # Запросы из тела потокового ответа тоже подписываются view.
+            response.streaming_content = self.stream(
+                response.streaming_content, slowlog.get_view()
+            )
+        else:
+            slowlog.finish()
+        return response
+
+    def stream(self, content, view_name):
+        slowlog.set_view(view_name)
+        try:
+            yield from content
+        finally:
+            slowlog.finish()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        slowlog.set_view(request.resolver_match.view_name)
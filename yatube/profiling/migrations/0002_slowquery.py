@@ -0,0 +1,34 @@
+# Generated by Django 2.2.28 on 2026-10-19 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('profiling', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=32, unique=True)),
+                ('query', models.TextField(help_text='SQL без значений параметров')),
+                ('alias', models.CharField(max_length=50)),
+                ('view_name', models.CharField(blank=True, max_length=200)),
+                ('template', models.CharField(blank=True, max_length=200)),
+                ('origin', models.CharField(blank=True, help_text='Строка кода проекта, из которой пришёл запрос', max_length=300)),
+                ('plan', models.TextField(blank=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('total_time', models.FloatField(default=0, help_text='мс')),
+                ('max_time', models.FloatField(default=0, help_text='мс')),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                'ordering': ['-total_time'],
+            },
+        ),
+    ]
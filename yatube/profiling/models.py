@@ -0,0 +1,66 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+User = get_user_model()
+
+
+class Profile(models.Model):
+    SAMPLE = 'sample'
+    HEADER = 'header'
+    TRIGGERS = [
+        (SAMPLE, 'Случайная выборка'),
+        (HEADER, 'Заголовок X-Profile'),
+    ]
+
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=500)
+    view_name = models.CharField(max_length=200, blank=True)
+    status = models.PositiveSmallIntegerField()
+    duration = models.FloatField(help_text='Время запроса, мс')
+    trigger = models.CharField(max_length=10, choices=TRIGGERS)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    query_count = models.PositiveIntegerField(default=0)
+    # [{'alias', 'sql', 'time'}, ...] в формате JSON.
+    queries = models.TextField(default='[]')
+    # Словарь pstats, сериализованный marshal, как в Stats.dump_stats().
+    stats = models.BinaryField()
+
+    class Meta:
+        ordering = ['-created']
+
+    def __str__(self):
+        return f'{self.method} {self.path} ({self.duration:.0f} ms)'
+
+
+class SlowQuery(models.Model):
+    """Медленные запросы, сгруппированные по нормализованному тексту."""
+
+    fingerprint = models.CharField(max_length=32, unique=True)
+    query = models.TextField(help_text='SQL без значений параметров')
+    alias = models.CharField(max_length=50)
+    view_name = models.CharField(max_length=200, blank=True)
+    template = models.CharField(max_length=200, blank=True)
+    origin = models.CharField(
+        max_length=300,
+        blank=True,
+        help_text='Строка кода проекта, из которой пришёл запрос'
+    )
+    plan = models.TextField(blank=True)
+    count = models.PositiveIntegerField(default=0)
+    total_time = models.FloatField(default=0, help_text='мс')
+    max_time = models.FloatField(default=0, help_text='мс')
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ['-total_time']
+
+    def __str__(self):
+        return self.query[:80]
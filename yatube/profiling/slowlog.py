@@ -0,0 +1,222 @@
+import atexit
+import hashlib
+import os
+import re
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.template.base import Template
+from django.utils import timezone
+
+from .models import SlowQuery
+
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PARAM_RE = re.compile(r'%s|\?')
+LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+# Полный просмотр таблицы в плане SQLite и PostgreSQL.
+FULL_SCAN_RES = (
+    re.compile(
+        r'\bSCAN (?:TABLE )?(?!CONSTANT\b|SUBQUERY\b)(\w+)\b'
+        r'(?! USING| VIRTUAL)'
+    ),
+    re.compile(r'Seq Scan on (\w+)'),
+)
+EXPLAIN_PREFIXES = {
+    'sqlite': 'EXPLAIN QUERY PLAN ',
+    'postgresql': 'EXPLAIN ',
+    'mysql': 'EXPLAIN ',
+}
+
+_state = threading.local()
+_lock = threading.Lock()
+# fingerprint -> накопленные данные до следующего flush().
+_buffer = {}
+# Для каких fingerprint этот процесс уже получил план.
+_explained = set()
+
+
+def normalize(sql):
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = PARAM_RE.sub('?', sql)
+    sql = LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+def fingerprint(query):
+    return hashlib.md5(query.encode()).hexdigest()
+
+
+def full_scans(plan):
+    """Таблицы, которые план читает целиком, без индекса."""
+    tables = []
+    for pattern in FULL_SCAN_RES:
+        tables += pattern.findall(plan)
+    return tables
+
+
+def set_view(view_name):
+    _state.view = view_name
+
+
+def get_view():
+    return getattr(_state, 'view', '') or ''
+
+
+def find_origin():
+    """Ближайшая строка кода проекта и шаблон, который рендерился."""
+    origin = template = ''
+    root = settings.BASE_DIR + os.sep
+    here = os.path.dirname(__file__)
+    frame = sys._getframe(2)
+    while frame is not None:
+        code = frame.f_code
+        if not origin and code.co_filename.startswith(root) \
+                and not code.co_filename.startswith(here):
+            origin = '{}:{} {}'.format(
+                os.path.relpath(code.co_filename, settings.BASE_DIR),
+                frame.f_lineno,
+                code.co_name,
+            )
+        owner = frame.f_locals.get('self')
+        if not template and isinstance(owner, Template) and owner.name:
+            template = owner.name
+        if origin and template:
+            break
+        frame = frame.f_back
+    return origin, template
+
+
+def explain(connection, sql, params):
+    prefix = EXPLAIN_PREFIXES.get(connection.vendor)
+    statement = sql.lstrip()[:6].upper()
+    if prefix is None or statement not in ('SELECT', 'UPDATE', 'DELETE'):
+        return ''
+    try:
+        # В точке сохранения: упавший EXPLAIN не должен прерывать
+        # транзакцию, внутри которой выполнялся исходный запрос.
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return '\n'.join(
+                    str(row[-1]) for row in cursor.fetchall()
+                )
+    except Exception as error:
+        return f'EXPLAIN failed: {error}'
+
+
+def record(connection, sql, params, many, elapsed):
+    query = normalize(sql)
+    key = fingerprint(query)
+    origin, template = find_origin()
+    plan = ''
+    if not many and key not in _explained:
+        _explained.add(key)
+        plan = explain(connection, sql, params)
+    with _lock:
+        entry = _buffer.setdefault(key, {
+            'query': query,
+            'alias': connection.alias,
+            'count': 0,
+            'total_time': 0.0,
+            'max_time': 0.0,
+            'plan': '',
+        })
+        entry['count'] += 1
+        entry['total_time'] += elapsed
+        entry['max_time'] = max(entry['max_time'], elapsed)
+        entry['view_name'] = get_view()
+        entry['origin'] = origin
+        entry['template'] = template
+        entry['plan'] = plan or entry['plan']
+
+
+def slow_query_wrapper(execute, sql, params, many, context):
+    """
+    execute_wrapper, подключаемый ко всем соединениям.
+
+    Для быстрых запросов стоит два вызова perf_counter(); медленные
+    попадают в буфер процесса вместе с планом и местом вызова.
+    """
+    threshold = getattr(settings, 'SLOW_QUERY_MS', None)
+    if threshold is None or getattr(_state, 'busy', False):
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    result = execute(sql, params, many, context)
+    elapsed = (time.perf_counter() - started) * 1000
+    if elapsed >= threshold:
+        _state.busy = True
+        try:
+            record(context['connection'], sql, params, many, elapsed)
+        finally:
+            _state.busy = False
+    return result
+
+
+def install(sender, connection, **kwargs):
+    """Обработчик connection_created."""
+    if slow_query_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(slow_query_wrapper)
+
+
+def has_pending():
+    return bool(_buffer)
+
+
+def finish():
+    """Конец запроса, задачи или команды: буфер пишется в SlowQuery."""
+    set_view('')
+    if has_pending():
+        flush()
+
+
+# Медленные запросы management-команд вне запроса и задачи
+# записываются при выходе процесса, даже если команда упала.
+atexit.register(finish)
+
+
+def task_started(sender, name, **kwargs):
+    set_view(f'task:{name}')
+
+
+def task_finished(sender, **kwargs):
+    finish()
+
+
+def flush():
+    """Переносит накопленное в SlowQuery; возвращает число записей."""
+    with _lock:
+        entries = dict(_buffer)
+        _buffer.clear()
+    _state.busy = True
+    try:
+        for key, entry in entries.items():
+            item, created = SlowQuery.objects.get_or_create(
+                fingerprint=key, defaults=entry
+            )
+            if created:
+                continue
+            changes = {
+                'count': F('count') + entry['count'],
+                'total_time': F('total_time') + entry['total_time'],
+                'max_time': Greatest('max_time', entry['max_time']),
+                'view_name': entry['view_name'],
+                'origin': entry['origin'],
+                'template': entry['template'],
+            }
+            if entry['plan']:
+                changes['plan'] = entry['plan']
+            # update() не трогает auto_now, поэтому last_seen явно.
+            SlowQuery.objects.filter(pk=item.pk).update(
+                last_seen=timezone.now(), **changes
+            )
+    finally:
+        _state.busy = False
+    return len(entries)
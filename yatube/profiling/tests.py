@@ -0,0 +1,151 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from background.core import Worker
+from posts.models import Comment, Post, User
+from posts.tasks import purge_user
+
+from . import slowlog
+from .models import Profile, SlowQuery
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            username='staff', is_staff=True
+        )
+        self.user = User.objects.create_user(username='TestUser')
+        Post.objects.create(text='Test post', author=self.user)
+        self.client = Client()
+        self.url = reverse('profile', args=[self.user.username])
+
+    def test_not_profiled_by_default(self):
+        self.client.force_login(self.user)
+        self.client.get(self.url, HTTP_X_PROFILE='1')
+        self.assertFalse(Profile.objects.exists())
+
+    def test_staff_header(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_PROFILE='1')
+        # Лента читается, пока отдаётся тело.
+        b''.join(response.streaming_content)
+        profile = Profile.objects.get()
+        self.assertEqual(response['X-Profile-Id'], str(profile.pk))
+        self.assertEqual(profile.view_name, 'profile')
+        self.assertEqual(profile.trigger, Profile.HEADER)
+        self.assertEqual(profile.user, self.staff)
+        self.assertGreater(profile.query_count, 0)
+
+        response = self.client.get(
+            reverse('profiling:detail', args=[profile.pk])
+        )
+        self.assertContains(response, 'posts/views.py')
+        self.assertContains(response, 'posts_post')
+        response = self.client.get(
+            reverse('profiling:download', args=[profile.pk])
+        )
+        self.assertEqual(response.content, bytes(profile.stats))
+
+    def test_stream_body_is_profiled(self):
+        """Запросы из тела потокового ответа попадают в тот же профиль."""
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, HTTP_X_PROFILE='1')
+        before = Profile.objects.get().query_count
+        self.assertIn(b'Test post', b''.join(response.streaming_content))
+        self.assertGreater(Profile.objects.get().query_count, before)
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0, PROFILING_KEEP=2)
+    def test_sampling_keeps_recent(self):
+        for _ in range(3):
+            self.client.get(self.url)
+        self.assertEqual(
+            list(Profile.objects.values_list('trigger', flat=True)),
+            [Profile.SAMPLE] * 2
+        )
+        self.assertNotIn('X-Profile-Id', self.client.get(self.url))
+
+    def test_list_is_staff_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('profiling:index'))
+        self.assertEqual(response.status_code, 302)
+        self.client.force_login(self.staff)
+        self.client.get(self.url, HTTP_X_PROFILE='1')
+        response = self.client.get(reverse('profiling:index'))
+        self.assertContains(response, self.url)
+
+
+@override_settings(SLOW_QUERY_MS=0)
+class SlowQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        slowlog._buffer.clear()
+        slowlog._explained.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.post = Post.objects.create(text='Test post', author=self.user)
+        Comment.objects.create(post=self.post, author=self.user, text='c')
+        self.client = Client()
+        slowlog._buffer.clear()
+
+    def test_normalize(self):
+        self.assertEqual(
+            slowlog.normalize(
+                "SELECT * FROM t WHERE a = 'x''y' AND id IN (%s, %s)\n"
+                "LIMIT 21"
+            ),
+            'SELECT * FROM t WHERE a = ? AND id IN (...) LIMIT ?'
+        )
+
+    def test_full_scans(self):
+        plan = (
+            'SCAN posts_comment\n'
+            'SEARCH posts_post USING INTEGER PRIMARY KEY (rowid=?)\n'
+            'SCAN posts_follow USING INDEX posts_follow_user_id\n'
+            'SCAN CONSTANT ROW'
+        )
+        self.assertEqual(slowlog.full_scans(plan), ['posts_comment'])
+        self.assertEqual(
+            slowlog.full_scans('Seq Scan on posts_follow  (cost=0.00..1)'),
+            ['posts_follow']
+        )
+
+    def test_requests_are_aggregated(self):
+        url = reverse('post', args=[self.user.username, self.post.pk])
+        for _ in range(2):
+            # Карточка автора рендерится уже в теле потокового ответа.
+            b''.join(self.client.get(url).streaming_content)
+        item = SlowQuery.objects.filter(
+            query__startswith='SELECT COUNT(*)',
+            query__contains='FROM "posts_follow"',
+            view_name='post',
+        ).first()
+        self.assertEqual(item.count, 2)
+        self.assertIn('posts_follow', item.plan)
+        self.assertTrue(item.origin)
+        self.assertEqual(item.template, 'includes/profile_card.html')
+
+    def test_failed_explain_keeps_transaction(self):
+        with transaction.atomic():
+            plan = slowlog.explain(connection, 'SELECT * FROM missing', [])
+            self.assertTrue(plan.startswith('EXPLAIN failed'))
+            self.assertTrue(Post.objects.exists())
+
+    @override_settings(BACKGROUND_TASKS='db')
+    def test_worker_tasks_are_flushed(self):
+        user = User.objects.create_user(username='Gone')
+        purge_user.delay(user_id=user.pk)
+        Worker().run(once=True)
+        self.assertTrue(SlowQuery.objects.filter(
+            view_name='task:posts.tasks.purge_user'
+        ).exists())
+
+    def test_report(self):
+        self.client.get(reverse('index'))
+        out = StringIO()
+        call_command('slow_queries', limit=5, reset=True, stdout=out)
+        self.assertIn('view: index', out.getvalue())
+        self.assertFalse(SlowQuery.objects.exists())
@@ -0,0 +1,14 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'profiling'
+
+urlpatterns = [
+    path('', views.index, name='index'),
+    path('slow-queries/', views.slow_queries, name='slow_queries'),
+    path('compression/', views.compression_stats, name='compression'),
+    path('throttling/', views.throttling, name='throttling'),
+    path('<int:pk>/', views.detail, name='detail'),
+    path('<int:pk>/pstats/', views.download, name='download'),
+]
@@ -0,0 +1,91 @@
+import io
+import json
+import marshal
+import os
+import pstats
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import get_object_or_404, render
+
+from yatube import compression, ratelimit
+
+from .models import Profile, SlowQuery
+from .slowlog import full_scans
+
+SORTS = ('cumulative', 'tottime', 'ncalls')
+
+
+def load_stats(profile, stream):
+    stats = pstats.Stats(stream=stream)
+    stats.stats = marshal.loads(bytes(profile.stats))
+    stats.get_top_level_stats()
+    return stats
+
+
+@staff_member_required
+def index(request):
+    profiles = Profile.objects.defer('queries', 'stats')
+    view_name = request.GET.get('view')
+    if view_name:
+        profiles = profiles.filter(view_name=view_name)
+    context = {
+        'profiles': profiles[:50],
+        'view_name': view_name,
+    }
+    return render(request, 'profiling/index.html', context)
+
+
+@staff_member_required
+def detail(request, pk):
+    profile = get_object_or_404(Profile, pk=pk)
+    stream = io.StringIO()
+    sort = request.GET.get('sort', 'cumulative')
+    if sort not in SORTS:
+        sort = 'cumulative'
+    load_stats(profile, stream).sort_stats(sort).print_stats(40)
+    queries = json.loads(profile.queries)
+    context = {
+        'profile': profile,
+        'report': stream.getvalue(),
+        'sort': sort,
+        'sorts': SORTS,
+        'queries': queries,
+        'query_time': sum(query['time'] for query in queries),
+    }
+    return render(request, 'profiling/detail.html', context)
+
+
+@staff_member_required
+def download(request, pk):
+    """Профиль в формате pstats для snakeviz, gprof2dot и т. п."""
+    profile = get_object_or_404(Profile, pk=pk)
+    response = HttpResponse(
+        bytes(profile.stats), content_type='application/octet-stream'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="profile-{profile.pk}.pstats"'
+    )
+    return response
+
+
+@staff_member_required
+def slow_queries(request):
+    queries = list(SlowQuery.objects.all()[:50])
+    for item in queries:
+        item.full_scans = full_scans(item.plan)
+    return render(request, 'profiling/slow_queries.html', {
+        'queries': queries,
+    })
+
+
+@staff_member_required
+def compression_stats(request):
+    """Счётчики compression.stats воркера, который ответил на запрос."""
+    return JsonResponse({'pid': os.getpid(), **compression.stats.snapshot()})
+
+
+@staff_member_required
+def throttling(request):
+    """Счётчики ratelimit.stats воркера, который ответил на запрос."""
+    return JsonResponse({'pid': os.getpid(), **ratelimit.stats.snapshot()})
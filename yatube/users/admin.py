@@ -1,3 +1,24 @@
 from django.contrib import admin
+from django.contrib.auth.admin import UserAdmin
 
-# Register your models here.
+from posts.models import User
+from posts.purge import schedule_user_deletion
+
+
+class QueuedDeleteUserAdmin(UserAdmin):
+    """
+    Пользователь сразу скрывается вместе с контентом, а строки
+    удаляет фоновая задача posts.purge_user пачками.
+    """
+
+    def delete_model(self, request, obj):
+        schedule_user_deletion(obj)
+
+    def delete_queryset(self, request, queryset):
+        for user in queryset:
+            schedule_user_deletion(user)
+
+
+# Импорт UserAdmin выше уже зарегистрировал стандартную админку.
+admin.site.unregister(User)
+admin.site.register(User, QueuedDeleteUserAdmin)
@@ -1,5 +1,23 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
 
 
 class UsersConfig(AppConfig):
     name = 'users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        if getattr(settings, 'REQUIRE_SHARED_CACHE', False) \
+                and isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache) \
+                and 'users.backends.CachedModelBackend' \
+                in settings.AUTHENTICATION_BACKENDS:
+            # Сигнал сбрасывает запись только в своём процессе:
+            # остальные воркеры до USER_CACHE_TIMEOUT видели бы
+            # заблокированного пользователя активным.
+            raise ImproperlyConfigured(
+                'CachedModelBackend требует общий кэш, а не LocMemCache'
+            )
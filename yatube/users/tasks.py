@@ -0,0 +1,21 @@
+from django.core.mail import EmailMultiAlternatives, get_connection
+
+from background.core import task
+
+
+@task(batch=True)
+def send_emails(messages):
+    """Отправляет накопившиеся письма через одно SMTP-соединение."""
+    emails = []
+    for message in messages:
+        email = EmailMultiAlternatives(
+            message['subject'],
+            message['body'],
+            message['from_email'],
+            message['to'],
+        )
+        if message.get('html'):
+            email.attach_alternative(message['html'], 'text/html')
+        emails.append(email)
+    with get_connection() as connection:
+        connection.send_messages(emails)
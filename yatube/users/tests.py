@@ -1,3 +1,94 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.apps import apps
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from background.core import run_pending
+from posts.models import User
+
+
+class CachedAuthTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_follow_index_skips_session_and_user_queries(self):
+        """Повторный запрос не читает сессию и пользователя из базы."""
+        self.client.get(reverse('follow_index'))
+        with self.assertNumQueries(2):
+            self.client.get(reverse('follow_index'))
+
+    def test_user_cache_invalidated_on_save(self):
+        self.client.get(reverse('follow_index'))
+        self.user.first_name = 'Максим'
+        self.user.save()
+        response = self.client.get(reverse('follow_index'))
+        self.assertEqual(response.context['user'].first_name, 'Максим')
+
+    @override_settings(REQUIRE_SHARED_CACHE=True)
+    def test_startup_refuses_local_cache(self):
+        """В LocMemCache у каждого воркера был бы свой пользователь."""
+        with self.assertRaises(ImproperlyConfigured):
+            apps.get_app_config('users').ready()
+
+    def test_purge_sessions(self):
+        Session.objects.create(
+            session_key='expired',
+            session_data='',
+            expire_date=timezone.now() - timedelta(days=1)
+        )
+        call_command(
+            'purge_sessions', batch_size=1, pause=0, stdout=StringIO()
+        )
+        self.assertFalse(Session.objects.filter(session_key='expired'))
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class PasswordResetTests(TestCase):
+    @override_settings(BACKGROUND_TASKS='memory')
+    def test_reset_email_sent_in_background(self):
+        """Письмо не уходит в запросе, а отправляется задачей."""
+        User.objects.create_user(
+            username='TestUser',
+            email='test@yatube.ru',
+            password='secret-password'
+        )
+        response = Client().post(
+            reverse('password_reset'),
+            {'email': 'test@yatube.ru'}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(run_pending(), 1)
+        self.assertEqual(mail.outbox[0].to, ['test@yatube.ru'])
+
+
+class AdminDeleteTests(TestCase):
+    @override_settings(BACKGROUND_TASKS='memory')
+    def test_admin_delete_is_queued(self):
+        """Удаление из админки только скрывает, строки удаляет задача."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@yatube.ru', password='secret'
+        )
+        user = User.objects.create_user(username='TestUser')
+        client = Client()
+        client.force_login(admin)
+        response = client.post(
+            reverse('admin:auth_user_delete', args=[user.pk]),
+            {'post': 'yes'}
+        )
+        self.assertEqual(response.status_code, 302)
+        user.refresh_from_db()
+        self.assertFalse(user.is_active)
+        self.assertEqual(run_pending(), 1)
+        self.assertFalse(User.objects.filter(pk=user.pk).exists())
@@ -0,0 +1,220 @@
+import hashlib
+import threading
+import time
+import zlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_max_age, patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_TYPES = (
+    'text/',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
+
+class CompressionStats:
+    """Счётчики сжатия: байты до/после и процессорное время."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.responses = 0
+            self.cache_hits = 0
+            self.bytes_in = 0
+            self.bytes_out = 0
+            self.cpu_time = 0.0
+
+    def record(self, bytes_in, bytes_out, cpu_time, cache_hit=False):
+        with self._lock:
+            self.responses += 1
+            self.cache_hits += int(cache_hit)
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.cpu_time += cpu_time
+
+    def snapshot(self):
+        with self._lock:
+            ratio = self.bytes_out / self.bytes_in if self.bytes_in else 1.0
+            return {
+                'responses': self.responses,
+                'cache_hits': self.cache_hits,
+                'bytes_in': self.bytes_in,
+                'bytes_out': self.bytes_out,
+                'ratio': ratio,
+                'cpu_time': self.cpu_time,
+            }
+
+
+stats = CompressionStats()
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def parse_accept_encoding(header):
+    """Возвращает {кодировка: q} из заголовка Accept-Encoding."""
+    result = {}
+    for item in header.split(','):
+        parts = item.strip().split(';')
+        coding = parts[0].strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in parts[1:]:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        result[coding] = q
+    return result
+
+
+def choose_encoding(header):
+    accepted = parse_accept_encoding(header or '')
+    wildcard = accepted.get('*', 0.0)
+    candidates = ['br', 'gzip'] if brotli is not None else ['gzip']
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def _compressor(encoding):
+    if encoding == 'br':
+        return brotli.Compressor(
+            quality=_setting('COMPRESSION_BROTLI_QUALITY', 5)
+        )
+    return zlib.compressobj(
+        _setting('COMPRESSION_GZIP_LEVEL', 6), zlib.DEFLATED, 31
+    )
+
+
+def compress_bytes(data, encoding):
+    compressor = _compressor(encoding)
+    if encoding == 'br':
+        return compressor.process(data) + compressor.finish()
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_stream(chunks, encoding):
+    """Сжимает поток по кусочкам, сбрасывая буфер после каждого."""
+    compressor = _compressor(encoding)
+    bytes_in = bytes_out = 0
+    cpu_time = 0.0
+    for chunk in chunks:
+        started = time.thread_time()
+        bytes_in += len(chunk)
+        if encoding == 'br':
+            data = compressor.process(chunk) + compressor.flush()
+        else:
+            data = compressor.compress(chunk) + compressor.flush(
+                zlib.Z_SYNC_FLUSH
+            )
+        cpu_time += time.thread_time() - started
+        if data:
+            bytes_out += len(data)
+            yield data
+    started = time.thread_time()
+    tail = compressor.finish() if encoding == 'br' else compressor.flush()
+    cpu_time += time.thread_time() - started
+    bytes_out += len(tail)
+    stats.record(bytes_in, bytes_out, cpu_time)
+    if tail:
+        yield tail
+
+
+def is_compressible(response):
+    if response.has_header('Content-Encoding'):
+        return False
+    # Файлы уходят через wsgi.file_wrapper в обход streaming_content.
+    if getattr(response, 'file_to_stream', None) is not None:
+        return False
+    if response.status_code != 200:
+        return False
+    content_type = response.get('Content-Type', '').lower()
+    types = _setting('COMPRESSION_TYPES', COMPRESSIBLE_TYPES)
+    return content_type.startswith(tuple(types))
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы brotli или gzip в зависимости от Accept-Encoding.
+
+    Потоковые ответы сжимаются по кусочкам. Сжатые тела обычных ответов
+    кэшируются по хэшу содержимого на время жизни ответа из cache_page,
+    поэтому горячие страницы сжимаются один раз.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if not is_compressible(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING'))
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compress_stream(
+                response.streaming_content, encoding
+            )
+            del response['Content-Length']
+        else:
+            min_length = _setting('COMPRESSION_MIN_LENGTH', 200)
+            if len(response.content) < min_length:
+                return response
+            compressed = self.compress_content(response, encoding)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def compress_content(self, response, encoding):
+        content = response.content
+        timeout = get_max_age(response)
+        key = None
+        if timeout:
+            digest = hashlib.md5(content).hexdigest()
+            key = f'compression:{encoding}:{digest}'
+            compressed = cache.get(key)
+            if compressed is not None:
+                stats.record(len(content), len(compressed), 0.0, True)
+                response['Server-Timing'] = 'compress;desc="cache";dur=0'
+                return compressed
+        started = time.thread_time()
+        compressed = compress_bytes(content, encoding)
+        cpu_time = time.thread_time() - started
+        stats.record(len(content), len(compressed), cpu_time)
+        if key is not None:
+            cache.set(key, compressed, timeout)
+        response['Server-Timing'] = f'compress;dur={cpu_time * 1000:.2f}'
+        return compressed
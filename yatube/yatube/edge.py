@@ -0,0 +1,84 @@
+import urllib.request
+from functools import wraps
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.cache import patch_cache_control, patch_vary_headers
+
+# Сколько ключей отправлять в одном запросе на очистку.
+PURGE_CHUNK = 200
+# Ключ всех лент: меняется при любом новом или удалённом посте.
+POSTS_KEY = 'posts'
+
+
+def key(kind, value):
+    """Ключ вида post-123 или user-Maxim, безопасный для заголовка."""
+    return '{}-{}'.format(kind, quote(str(value), safe='@.+-_'))
+
+
+def add_surrogate_keys(request, *keys):
+    request.__dict__.setdefault('surrogate_keys', set()).update(keys)
+
+
+def edge_cache(view):
+    """
+    Разрешает кэшировать ответ прокси или CDN.
+
+    Анонимный ответ получает Cache-Control с s-maxage и ключи из
+    add_surrogate_keys(). Запросы с сессией и страницы с CSRF-токеном
+    прокси не кэширует, но Django-кэш view продолжает работать.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if request.method not in ('GET', 'HEAD') \
+                or response.status_code != 200:
+            return response
+        patch_vary_headers(response, ('Cookie',))
+        if settings.SESSION_COOKIE_NAME in request.COOKIES \
+                or request.META.get('CSRF_COOKIE_USED'):
+            patch_cache_control(response, no_cache=True)
+            return response
+        # max-age не трогаем: max-age=0 отключил бы cache_page.
+        patch_cache_control(
+            response, public=True, s_maxage=settings.EDGE_CACHE_MAX_AGE
+        )
+        keys = getattr(request, 'surrogate_keys', None)
+        if keys:
+            response[settings.EDGE_SURROGATE_HEADER] = ' '.join(sorted(keys))
+        return response
+    return wrapper
+
+
+def send_purge(keys):
+    """Отправляет прокси запросы на очистку по ключам, пачками."""
+    keys = sorted(set(keys))
+    for start in range(0, len(keys), PURGE_CHUNK):
+        request = urllib.request.Request(
+            settings.EDGE_PURGE_URL,
+            method=settings.EDGE_PURGE_METHOD,
+            headers={
+                settings.EDGE_PURGE_HEADER:
+                    ' '.join(keys[start:start + PURGE_CHUNK]),
+            }
+        )
+        with urllib.request.urlopen(
+            request, timeout=settings.EDGE_PURGE_TIMEOUT
+        ):
+            pass
+
+
+def purge_later(*keys):
+    """
+    Ставит очистку ключей в фоновую очередь после коммита.
+
+    Задача edge.purge пакетная: воркер сливает ключи всех
+    накопившихся задач в один запрос к прокси.
+    """
+    if not settings.EDGE_PURGE_URL:
+        return
+    from background.core import enqueue
+
+    keys = sorted(set(keys))
+    transaction.on_commit(lambda: enqueue('edge.purge', keys=keys))
@@ -0,0 +1,140 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_etags
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+# Имена из ContentAddressedStorage и миниатюры sorl не меняют содержимого.
+IMMUTABLE_RE = re.compile(r'(^|/)[0-9a-f]{32,64}\.\w+$')
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+
+
+class FileRange:
+    """
+    Файл, из которого можно прочитать не больше length байт.
+
+    fileno() отдаётся как есть: wsgi.file_wrapper (например, в gunicorn)
+    отправит диапазон через os.sendfile с текущей позиции на
+    Content-Length байт, а без него FileResponse читает через read().
+    """
+
+    def __init__(self, file, start, length):
+        self.file = file
+        self.remaining = length
+        file.seek(start)
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Возвращает (start, end) включительно, None или 'invalid'."""
+    match = RANGE_RE.match(header or '')
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return 'invalid'
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        return 'invalid'
+    return start, end
+
+
+def cache_control(path):
+    if IMMUTABLE_RE.search(path):
+        return f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+    return f'public, max-age={settings.MEDIA_MAX_AGE}'
+
+
+def serve_media(request, path):
+    """
+    Отдаёт файлы из MEDIA_ROOT без чтения их целиком в Python.
+
+    При MEDIA_OFFLOAD = 'x-accel' или 'x-sendfile' передачу делает
+    прокси, иначе ответ строится поверх файла с поддержкой Range
+    и If-None-Match.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, ValueError, OSError):
+        raise Http404('Файл не найден')
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('Файл не найден')
+
+    etag = '"{:x}-{:x}"'.format(
+        int(stat_result.st_mtime), stat_result.st_size
+    )
+    content_type, encoding = mimetypes.guess_type(full_path)
+    headers = {
+        'ETag': etag,
+        'Last-Modified': http_date(stat_result.st_mtime),
+        'Cache-Control': cache_control(path),
+        'Accept-Ranges': 'bytes',
+    }
+    # Слабое сравнение (RFC 7232): W/ у тегов из запроса не учитывается.
+    etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+    if '*' in etags or etag in {tag.replace('W/', '', 1) for tag in etags}:
+        return with_headers(HttpResponse(status=304), headers)
+
+    offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+    if offload:
+        response = HttpResponse(
+            content_type=content_type or 'application/octet-stream'
+        )
+        if offload == 'x-accel':
+            response['X-Accel-Redirect'] = (
+                settings.MEDIA_ACCEL_PREFIX + path.lstrip('/')
+            )
+        else:
+            response['X-Sendfile'] = full_path
+        return with_headers(response, headers)
+
+    size = stat_result.st_size
+    byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    if byte_range == 'invalid':
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return with_headers(response, headers)
+    start, end = byte_range or (0, size - 1)
+    length = max(end - start + 1, 0)
+    response = FileResponse(
+        FileRange(open(full_path, 'rb'), start, length),
+        status=206 if byte_range else 200,
+        content_type=content_type or 'application/octet-stream'
+    )
+    response['Content-Length'] = str(length)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return with_headers(response, headers)
+
+
+def with_headers(response, headers):
+    for name, value in headers.items():
+        response[name] = value
+    return response
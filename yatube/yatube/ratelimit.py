@@ -0,0 +1,181 @@
+import logging
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import DEFAULT_CACHE_ALIAS, cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.exceptions import ImproperlyConfigured
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+LOCAL_BLOCKS_LIMIT = 10000
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period]
+
+
+class ThrottleStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.allowed = Counter()
+        self.throttled = Counter()
+        self.local_rejects = Counter()
+
+    def record(self, scope, allowed, local=False):
+        with self._lock:
+            if allowed:
+                self.allowed[scope] += 1
+            else:
+                self.throttled[scope] += 1
+                self.local_rejects[scope] += int(local)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'allowed': dict(self.allowed),
+                'throttled': dict(self.throttled),
+                'local_rejects': dict(self.local_rejects),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.allowed.clear()
+            self.throttled.clear()
+            self.local_rejects.clear()
+
+
+stats = ThrottleStats()
+# (scope, ident) -> момент, до которого этот процесс отказывает сам,
+# не обращаясь к общему кэшу.
+_local_blocks = {}
+
+
+def client_ident(request, key):
+    if key == 'user':
+        user_id = request.session.get(SESSION_KEY)
+        if user_id is not None:
+            return f'user:{user_id}'
+    if getattr(settings, 'RATELIMIT_TRUST_FORWARDED', False):
+        forwarded = request.META.get('HTTP_X_FORWARDED_FOR', '')
+        if forwarded:
+            return 'ip:' + forwarded.split(',')[0].strip()
+    return 'ip:' + request.META.get('REMOTE_ADDR', '')
+
+
+def consume(scope, ident, rate, now=None):
+    """
+    Забирает один токен из ведра scope/ident в общем кэше.
+
+    Ведро хранится как два счётчика соседних интервалов: текущий
+    увеличивается атомарным incr, а остаток предыдущего убывает линейно,
+    что даёт непрерывное пополнение без чтения-записи одного ключа.
+    Возвращает (разрешено, секунд до следующего токена).
+    """
+    limit, period = parse_rate(rate)
+    now = time.time() if now is None else now
+    slot, offset = divmod(now, period)
+    key = f'ratelimit:{scope}:{ident}:{int(slot)}'
+    cache.add(key, 0, period * 2)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, period * 2)
+        used = 1
+    previous = cache.get(f'ratelimit:{scope}:{ident}:{int(slot) - 1}', 0)
+    level = previous * (1 - offset / period) + used
+    if level <= limit:
+        return True, 0
+    return False, max(1, int(period - offset))
+
+
+def check(request, scope, rate, key='user'):
+    """Возвращает ответ 429, если лимит исчерпан, иначе None."""
+    if not getattr(settings, 'RATELIMIT_ENABLE', True):
+        return None
+    ident = client_ident(request, key)
+    now = time.time()
+    blocked_until = _local_blocks.get((scope, ident))
+    if blocked_until is not None:
+        if blocked_until > now:
+            stats.record(scope, False, local=True)
+            return throttled_response(blocked_until - now)
+        del _local_blocks[(scope, ident)]
+    allowed, retry_after = consume(scope, ident, rate, now)
+    stats.record(scope, allowed)
+    if allowed:
+        return None
+    if len(_local_blocks) >= LOCAL_BLOCKS_LIMIT:
+        _local_blocks.clear()
+    _local_blocks[(scope, ident)] = now + retry_after
+    logger.info('Throttled %s for %s', scope, ident)
+    return throttled_response(retry_after)
+
+
+def throttled_response(retry_after):
+    response = HttpResponse(
+        'Слишком много запросов, попробуйте позже.',
+        status=429,
+        content_type='text/plain; charset=utf-8'
+    )
+    response['Retry-After'] = str(int(retry_after) or 1)
+    return response
+
+
+def ratelimit(rate, key='user', methods=('POST',), scope=None):
+    """Ограничивает частоту вызова view: @ratelimit('10/m')."""
+    def decorator(view):
+        name = scope or view.__name__
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if methods is None or request.method in methods:
+                response = check(request, name, rate, key)
+                if response is not None:
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class RateLimitMiddleware:
+    """
+    Лимиты из settings.RATELIMITS для view, которые нельзя обернуть
+    декоратором (например, классы из users и django.contrib.auth).
+
+    RATELIMITS = {'signup': ('5/h', 'ip', ('POST',))}
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if getattr(settings, 'REQUIRE_SHARED_CACHE', False) \
+                and getattr(settings, 'RATELIMITS', {}) \
+                and isinstance(caches[DEFAULT_CACHE_ALIAS], LocMemCache):
+            # С вёдрами в памяти процесса каждый воркер пропускал бы
+            # свой лимит, и реальный был бы в число воркеров больше.
+            raise ImproperlyConfigured(
+                'RATELIMITS требуют общий кэш, а не LocMemCache'
+            )
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        match = request.resolver_match
+        rule = getattr(settings, 'RATELIMITS', {}).get(
+            match.url_name if match else None
+        )
+        if rule is None:
+            return None
+        rate, key, methods = rule
+        if methods is not None and request.method not in methods:
+            return None
+        return check(request, match.url_name, rate, key)
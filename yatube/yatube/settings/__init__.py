@@ -0,0 +1,7 @@
+import os
+
+# YATUBE_ENV: dev (по умолчанию) или prod.
+if os.environ.get('YATUBE_ENV', 'dev') == 'prod':
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
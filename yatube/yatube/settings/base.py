@@ -0,0 +1,253 @@
+"""
+Общие настройки yatube; dev.py и prod.py дополняют их.
+
+Generated by 'django-admin startproject' using Django 2.2.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/2.2/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/2.2/ref/settings/
+"""
+
+import os
+
+# Build paths inside the project like this: os.path.join(BASE_DIR, ...)
+BASE_DIR = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+)
+
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'b*=18_hs*286(zrj_0&v^a1sx4_=jbh893i+v)5vinlldic5=p'
+
+DEBUG = False
+
+ALLOWED_HOSTS = [
+        "*",
+    ]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'users',
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'sorl.thumbnail',
+    'posts',
+    'about',
+    'new_design',
+    'background',
+    'notifications',
+    'archive',
+    'profiling',
+]
+
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'profiling.middleware.SlowQueryMiddleware',
+    'yatube.compression.CompressionMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'yatube.ratelimit.RateLimitMiddleware',
+    'profiling.middleware.ProfilingMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'yatube.urls'
+TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [TEMPLATES_DIR],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'notifications.context_processors.unread_notifications',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'yatube.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/2.2/ref/settings/#databases
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+    },
+    'archive': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.path.join(BASE_DIR, 'archive.sqlite3'),
+    },
+}
+
+DATABASE_ROUTERS = ['archive.routers.ArchiveRouter']
+
+# Посты старше этого срока переносятся в базу archive.
+ARCHIVE_AFTER_DAYS = 365
+
+
+# Password validation
+# https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': ('django.contrib.auth.password_validation.'
+                 'UserAttributeSimilarityValidator'),
+    },
+    {
+        'NAME': ('django.contrib.auth.password_validation.'
+                 'MinimumLengthValidator'),
+    },
+    {
+        'NAME': ('django.contrib.auth.password_validation.'
+                 'CommonPasswordValidator'),
+    },
+    {
+        'NAME': ('django.contrib.auth.password_validation.'
+                 'NumericPasswordValidator'),
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/2.2/topics/i18n/
+
+LANGUAGE_CODE = 'ru'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_L10N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/2.2/howto/static-files/
+
+STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, "static")
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Пусто — файлы отдаёт Django, 'x-accel' — nginx, 'x-sendfile' — apache.
+MEDIA_OFFLOAD = os.environ.get('YATUBE_MEDIA_OFFLOAD') or None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_MAX_AGE = 60 * 60
+
+LOGIN_URL = "/auth/login/"
+LOGIN_REDIRECT_URL = "index"
+
+TRENDING_WINDOW_HOURS = 72
+TRENDING_HALF_LIFE_HOURS = 12
+
+# Подсказки групп в форме поста: сколько показывать и сколько кэшировать.
+GROUP_AUTOCOMPLETE_LIMIT = 10
+GROUP_AUTOCOMPLETE_TIMEOUT = 60 * 10
+
+COMPRESSION_MIN_LENGTH = 200
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
+
+# Профиль и запись отдаются по частям: шапка и меню сразу, блок content
+# следом кусками по STREAM_CHUNK_SIZE байт.
+STREAM_RESPONSES = True
+STREAM_CHUNK_SIZE = 16 * 1024
+
+# url_name: (частота, ключ 'user' или 'ip', методы)
+RATELIMITS = {
+    'signup': ('5/h', 'ip', ('POST',)),
+    'login': ('20/h', 'ip', ('POST',)),
+}
+
+# db — очередь в таблице, memory — в процессе (для тестов), eager — сразу.
+BACKGROUND_TASKS = 'db'
+BACKGROUND_RETRY_DELAY = 10
+
+NOTIFICATIONS_COUNTER_TIMEOUT = 60 * 60 * 24
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+USER_CACHE_TIMEOUT = 60
+
+# YATUBE_SESSIONS: db, cached_db или signed_cookies.
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_ENGINE = SESSION_ENGINES[
+    os.environ.get('YATUBE_SESSIONS', 'cached_db')
+]
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Отметки о просмотрах постов, см. VIEW_DEDUP_CACHE: отдельно, чтобы
+    # их не вытесняли страницы из default и не сбрасывал его clear().
+    'views': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'views',
+    },
+}
+
+# Пользователь из CachedModelBackend и вёдра лимитов живут в кэше.
+# В LocMemCache у каждого процесса своя копия: при нескольких
+# воркерах запуск с ним запрещается, см. prod.py.
+REQUIRE_SHARED_CACHE = False
+
+# Кэш прокси/CDN для анонимных страниц, см. yatube.edge. Без
+# EDGE_PURGE_URL очистка не отправляется.
+EDGE_CACHE_MAX_AGE = 60 * 5
+EDGE_SURROGATE_HEADER = 'Surrogate-Key'
+EDGE_PURGE_URL = os.environ.get('YATUBE_EDGE_PURGE_URL') or None
+EDGE_PURGE_METHOD = 'PURGE'
+EDGE_PURGE_HEADER = 'Surrogate-Key'
+EDGE_PURGE_TIMEOUT = 5
+
+# Просмотры постов копятся в процессе и пишутся пачкой, см.
+# posts.counters. Повторный просмотр того же посетителя в течение
+# VIEW_DEDUP_TIMEOUT секунд не считается.
+VIEW_FLUSH_INTERVAL = 10
+VIEW_FLUSH_SIZE = 1000
+VIEW_DEDUP_TIMEOUT = 60 * 30
+VIEW_DEDUP_CACHE = 'views'
+# Тесты дописывают буфер просмотров, пока тестовые базы ещё живы.
+TEST_RUNNER = 'yatube.test_runner.TestRunner'
+
+# На сколько строк делится счётчик реакций поста или комментария,
+# см. posts.reactions.
+REACTION_SHARDS = 8
+
+# Доля запросов, которые профилируются; сотрудник может включить
+# профиль запроса заголовком X-Profile: 1.
+PROFILING_SAMPLE_RATE = float(os.environ.get('YATUBE_PROFILE_RATE', 0))
+PROFILING_HEADER = 'HTTP_X_PROFILE'
+PROFILING_KEEP = 200
+
+# Запросы к базе дольше стольких миллисекунд попадают в SlowQuery;
+# None выключает журнал.
+SLOW_QUERY_MS = 100
+
+# Прогрев процесса из yatube.wsgi до приёма запросов, см. yatube.warmup.
+WARMUP_ON_START = os.environ.get('YATUBE_WARMUP') == '1'
+WARMUP_URLS = ['/', '/trending/']
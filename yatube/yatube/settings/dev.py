@@ -0,0 +1,17 @@
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE
+
+DEBUG = True
+
+# debug_toolbar хранит историю SQL в памяти, поэтому только здесь.
+INSTALLED_APPS = INSTALLED_APPS + ['debug_toolbar']
+# Сразу после сжатия, чтобы панель встраивалась в несжатый HTML.
+MIDDLEWARE = list(MIDDLEWARE)
+MIDDLEWARE.insert(
+    MIDDLEWARE.index('yatube.compression.CompressionMiddleware') + 1,
+    'debug_toolbar.middleware.DebugToolbarMiddleware'
+)
+
+INTERNAL_IPS = [
+    '127.0.0.1',
+]
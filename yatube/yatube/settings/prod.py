@@ -0,0 +1,39 @@
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import DATABASES, TEMPLATES
+
+DEBUG = False
+
+SECRET_KEY = os.environ['YATUBE_SECRET_KEY']
+
+ALLOWED_HOSTS = os.environ.get('YATUBE_ALLOWED_HOSTS', 'localhost').split(',')
+
+# Соединения с базой переживают запрос, а не открываются заново.
+for database in DATABASES.values():
+    database['CONN_MAX_AGE'] = 60
+
+# Шаблоны компилируются один раз на процесс.
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+# Общий для всех воркеров кэш: YATUBE_MEMCACHED=host:port[,host:port].
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['YATUBE_MEMCACHED'].split(','),
+    },
+    'views': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['YATUBE_MEMCACHED'].split(','),
+        'KEY_PREFIX': 'views',
+    },
+}
+REQUIRE_SHARED_CACHE = True
+
+WARMUP_ON_START = os.environ.get('YATUBE_WARMUP', '1') == '1'
@@ -0,0 +1,124 @@
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template import loader
+from django.template.context import make_context
+from django.template.base import Node, TextNode
+from django.template.loader_tags import BlockNode
+
+logger = logging.getLogger(__name__)
+
+# Блок base.html, который уходит клиенту после шапки.
+CONTENT_BLOCK = 'content'
+# На его месте в шапке стоит отметка, по ней страница и режется.
+MARKER = '<!--yatube:stream-->'
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+@lru_cache(maxsize=None)
+def shell_template(engine):
+    """Страница, у которой блок content заменён отметкой."""
+    return engine.from_string(
+        '{% extends stream_page %}'
+        f'{{% block {CONTENT_BLOCK} %}}{MARKER}{{% endblock %}}'
+    )
+
+
+def content_block(template):
+    for block in template.nodelist.get_nodes_by_type(BlockNode):
+        if block.name == CONTENT_BLOCK:
+            return block
+    return None
+
+
+def render_content(template, block, context):
+    """
+    Блок content страницы по частям, как его рендерит Template.render.
+
+    Узлы верхнего уровня рендерятся по очереди, и вывод каждого тега
+    (цикла по ленте, include) отдаётся сразу вместе с текстом перед
+    ним, поэтому запросы следующих тегов идут, когда предыдущие части
+    уже у клиента.
+    """
+    with context.render_context.push_state(template):
+        with context.bind_template(template):
+            context.template_name = template.name
+            with context.push(block=block):
+                bits = []
+                for node in block.nodelist:
+                    if isinstance(node, Node):
+                        bits.append(str(node.render_annotated(context)))
+                    else:
+                        bits.append(node)
+                    if not isinstance(node, TextNode):
+                        yield ''.join(bits)
+                        bits = []
+                yield ''.join(bits)
+
+
+def logged(content, request):
+    try:
+        yield from content
+    except Exception:
+        # Заголовки уже ушли, заменить ответ на 500 нельзя: клиент
+        # получит оборванную страницу, а ошибка — в журнал.
+        logger.exception('Streaming %s failed', request.path)
+        raise
+
+
+def stream(head, content, tail, chunk_size):
+    yield head
+    for part in content:
+        part = part.encode()
+        for start in range(0, len(part), chunk_size):
+            yield part[start:start + chunk_size]
+    yield tail
+
+
+def render_stream(request, template_name, context=None, status=None):
+    """
+    Как render(), но страница уходит клиенту по частям.
+
+    Страница, унаследованная от base.html, режется по блоку content:
+    всё вокруг него (head, меню, подвал) рендерится обычным render
+    ещё внутри view и уходит первым куском вместе с заголовками,
+    а сам блок — следом, по тегам, уже после ответа view. Поэтому
+    всё, что влияет на заголовки (ключи прокси, csrf_token анонима),
+    должно решаться вне блока content, а тяжёлые запросы лучше
+    отдавать шаблону лениво (SimpleLazyObject), чтобы они шли уже
+    во время отдачи блока.
+
+    Потоковый ответ cache_page не сохраняет, поэтому, когда view
+    под cache_page промахнулся мимо кэша, страница рендерится целиком,
+    как и шаблоны без блока content.
+    """
+    template = loader.get_template(template_name)
+    block = content_block(template.template)
+    if block is None or not _setting('STREAM_RESPONSES', True) \
+            or getattr(request, '_cache_update_cache', False):
+        return render(request, template_name, context, status=status)
+    if request.user.is_authenticated:
+        # Формы вошедшего пользователя рендерятся уже после
+        # CsrfViewMiddleware: cookie с токеном ставится заранее.
+        get_token(request)
+    engine = template.template.engine
+    context = make_context(
+        {**(context or {}), 'stream_page': template.template},
+        request,
+        autoescape=engine.autoescape
+    )
+    head, _, tail = shell_template(engine).render(context).partition(MARKER)
+    content = stream(
+        head.encode(),
+        render_content(template.template, block, context),
+        tail.encode(),
+        _setting('STREAM_CHUNK_SIZE', 16 * 1024)
+    )
+    return StreamingHttpResponse(logged(content, request), status=status)
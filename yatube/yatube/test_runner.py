@@ -0,0 +1,20 @@
+from django.test.runner import DiscoverRunner
+
+from posts.counters import views
+from profiling import slowlog
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Перед удалением тестовых баз записывает в них буферы просмотров
+    и медленных запросов.
+
+    Иначе буферы сбросятся при выходе через atexit, когда соединения
+    уже снова смотрят на рабочие базы, и id тестовых постов попадут
+    в чужие посты.
+    """
+
+    def teardown_databases(self, old_config, **kwargs):
+        views.flush()
+        slowlog.finish()
+        super().teardown_databases(old_config, **kwargs)
@@ -0,0 +1,70 @@
+import gzip
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+from django.utils.cache import patch_response_headers
+
+from posts.models import User
+from yatube import compression
+from yatube.compression import CompressionMiddleware, choose_encoding
+
+
+class CompressionMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        compression.stats.reset()
+        self.factory = RequestFactory()
+        self.body = b'<p>Yatube</p>' * 200
+
+    def get(self, response, encoding='gzip'):
+        request = self.factory.get('/', HTTP_ACCEPT_ENCODING=encoding)
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(request)
+
+    def test_choose_encoding(self):
+        """Выбирается кодировка с наибольшим q."""
+        self.assertEqual(choose_encoding('gzip, deflate'), 'gzip')
+        self.assertIsNone(choose_encoding('identity'))
+        self.assertIsNone(choose_encoding('gzip;q=0'))
+        if compression.brotli is not None:
+            self.assertEqual(choose_encoding('gzip, br'), 'br')
+            self.assertEqual(choose_encoding('gzip, br;q=0.5'), 'gzip')
+
+    def test_gzip_html(self):
+        response = self.get(HttpResponse(self.body))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), self.body)
+        self.assertLess(compression.stats.snapshot()['ratio'], 1)
+
+    def test_skip_small_and_images(self):
+        small = self.get(HttpResponse(b'ok'))
+        self.assertFalse(small.has_header('Content-Encoding'))
+        image = self.get(HttpResponse(self.body, content_type='image/jpeg'))
+        self.assertFalse(image.has_header('Content-Encoding'))
+
+    def test_streaming(self):
+        response = self.get(StreamingHttpResponse(iter([self.body] * 3)))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(body), self.body * 3)
+
+    def test_cached_response_compressed_once(self):
+        for _ in range(3):
+            response = HttpResponse(self.body)
+            patch_response_headers(response, 60)
+            response = self.get(response)
+        self.assertEqual(compression.stats.snapshot()['cache_hits'], 2)
+        self.assertIn('desc="cache"', response['Server-Timing'])
+
+    def test_stats_for_staff(self):
+        self.get(HttpResponse(self.body))
+        client = Client()
+        client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        stats = client.get(reverse('profiling:compression')).json()
+        self.assertGreaterEqual(stats['responses'], 1)
+        self.assertLess(stats['ratio'], 1)
@@ -0,0 +1,111 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from django.core.cache import cache
+from django.test import Client, TestCase, TransactionTestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from posts.models import Comment, Group, Post, User
+from yatube.edge import key
+
+
+class PurgeHandler(BaseHTTPRequestHandler):
+    def do_PURGE(self):
+        self.server.purged.append(self.headers['Surrogate-Key'].split())
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class EdgeHeadersTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Maxim')
+        self.group = Group.objects.create(
+            title='leo', slug='leo', description='leo'
+        )
+        self.post = Post.objects.create(
+            text='Test post', author=self.user, group=self.group
+        )
+        self.client = Client()
+
+    def test_anonymous_pages_are_public(self):
+        post_key = f'post-{self.post.pk}'
+        pages = {
+            reverse('index'): ['posts', post_key],
+            reverse('group', args=['leo']): ['group-leo', post_key],
+            # Профиль очищается по ключу автора, см. purge_comment.
+            reverse('profile', args=['Maxim']): ['user-Maxim'],
+            reverse('post', args=['Maxim', self.post.pk]):
+                ['user-Maxim', post_key],
+        }
+        for url, page_keys in pages.items():
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertIn('public', response['Cache-Control'])
+                self.assertIn('s-maxage=300', response['Cache-Control'])
+                self.assertIn('Cookie', response['Vary'])
+                keys = response['Surrogate-Key'].split()
+                for page_key in page_keys:
+                    self.assertIn(page_key, keys)
+
+    def test_session_requests_are_not_shared(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('profile', args=['Maxim']))
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertNotIn('public', response['Cache-Control'])
+        self.assertFalse(response.has_header('Surrogate-Key'))
+
+    def test_key_is_header_safe(self):
+        self.assertEqual(key('user', 'Макс'), 'user-%D0%9C%D0%B0%D0%BA%D1%81')
+
+
+class EdgePurgeTests(TransactionTestCase):
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), PurgeHandler)
+        self.server.purged = []
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        url = 'http://127.0.0.1:{}/'.format(self.server.server_port)
+        self.settings_override = override_settings(
+            EDGE_PURGE_URL=url, BACKGROUND_TASKS='eager'
+        )
+        self.settings_override.enable()
+        self.user = User.objects.create_user(username='Maxim')
+        self.group = Group.objects.create(
+            title='leo', slug='leo', description='leo'
+        )
+
+    def tearDown(self):
+        self.settings_override.disable()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_post_changes_purge_pages(self):
+        post = Post.objects.create(
+            text='Test post', author=self.user, group=self.group
+        )
+        self.assertIn(
+            ['group-leo', f'post-{post.pk}', 'posts', 'user-Maxim'],
+            self.server.purged
+        )
+        self.server.purged.clear()
+        Comment.objects.create(post=post, author=self.user, text='c')
+        self.assertEqual(
+            self.server.purged, [[f'post-{post.pk}', 'user-Maxim']]
+        )
+
+    def test_moved_post_purges_both_groups(self):
+        post = Post.objects.create(
+            text='Test post', author=self.user, group=self.group
+        )
+        other = Group.objects.create(title='cat', slug='cat', description='')
+        self.server.purged.clear()
+        post.group = other
+        post.save()
+        self.assertIn('group-leo', self.server.purged[0])
+        self.assertIn('group-cat', self.server.purged[0])
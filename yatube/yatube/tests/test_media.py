@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+
+from django.test import Client, TestCase, override_settings
+
+HASHED = 'posts/ab/cd/' + 'a' * 64 + '.jpg'
+
+
+class MediaServingTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.media_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.media_override.enable()
+        super().setUpClass()
+        os.makedirs(os.path.join(cls.media_root, 'posts/ab/cd'))
+        with open(os.path.join(cls.media_root, HASHED), 'wb') as image:
+            image.write(bytes(range(256)) * 4)
+        old = os.path.join(cls.media_root, 'posts/old.jpg')
+        with open(old, 'wb') as image:
+            image.write(b'old')
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.media_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+
+    def test_full_file_with_cache_headers(self):
+        response = self.client.get('/media/' + HASHED)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            bytes(range(256)) * 4
+        )
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertIn('immutable', response['Cache-Control'])
+        old = self.client.get('/media/posts/old.jpg')
+        self.assertNotIn('immutable', old['Cache-Control'])
+
+    def test_range(self):
+        response = self.client.get(
+            '/media/' + HASHED,
+            HTTP_RANGE='bytes=10-19'
+        )
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/1024')
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            bytes(range(10, 20))
+        )
+        suffix = self.client.get('/media/' + HASHED, HTTP_RANGE='bytes=-2')
+        self.assertEqual(b''.join(suffix.streaming_content), b'\xfe\xff')
+        bad = self.client.get('/media/' + HASHED, HTTP_RANGE='bytes=5000-')
+        self.assertEqual(bad.status_code, 416)
+
+    def test_if_none_match(self):
+        etag = self.client.get('/media/' + HASHED)['ETag']
+        response = self.client.get(
+            '/media/' + HASHED,
+            HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        for header in ('"other", W/' + etag, '*'):
+            response = self.client.get(
+                '/media/' + HASHED,
+                HTTP_IF_NONE_MATCH=header
+            )
+            self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            '/media/' + HASHED,
+            HTTP_IF_NONE_MATCH='"other"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(MEDIA_OFFLOAD='x-accel')
+    def test_accel_redirect(self):
+        response = self.client.get('/media/' + HASHED)
+        self.assertEqual(
+            response['X-Accel-Redirect'],
+            '/protected-media/' + HASHED
+        )
+        self.assertEqual(response.content, b'')
+
+    def test_outside_media_root(self):
+        response = Client().get('/media/../manage.py')
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,66 @@
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from yatube import ratelimit
+
+
+class RateLimitTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ratelimit.stats.reset()
+        ratelimit._local_blocks.clear()
+        self.user = User.objects.create_user(username='TestUser')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_bucket_refills(self):
+        for _ in range(3):
+            self.assertTrue(ratelimit.consume('t', 'a', '3/m', now=60)[0])
+        allowed, retry_after = ratelimit.consume('t', 'a', '3/m', now=60)
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 60)
+        self.assertFalse(ratelimit.consume('t', 'a', '3/m', now=121)[0])
+        self.assertTrue(ratelimit.consume('t', 'a', '3/m', now=170)[0])
+
+    def test_new_post_throttled_without_db_work(self):
+        """После исчерпания лимита запрос отклоняется без записи в базу."""
+        for i in range(10):
+            self.client.post(reverse('new_post'), {'text': f'post {i}'})
+        self.assertEqual(Post.objects.count(), 10)
+        response = self.client.post(reverse('new_post'), {'text': 'spam'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+        with self.assertNumQueries(0):
+            response = self.client.post(reverse('new_post'), {'text': 'spam'})
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(Post.objects.count(), 10)
+        snapshot = ratelimit.stats.snapshot()
+        self.assertEqual(snapshot['throttled']['new_post'], 2)
+        self.assertEqual(snapshot['local_rejects']['new_post'], 1)
+
+    @override_settings(RATELIMITS={'signup': ('1/h', 'ip', ('POST',))})
+    def test_middleware_limits_signup_by_ip(self):
+        guest = Client()
+        self.assertEqual(guest.get(reverse('signup')).status_code, 200)
+        guest.post(reverse('signup'), {})
+        response = guest.post(reverse('signup'), {})
+        self.assertEqual(response.status_code, 429)
+
+    @override_settings(REQUIRE_SHARED_CACHE=True)
+    def test_middleware_requires_shared_cache(self):
+        with self.assertRaises(ImproperlyConfigured):
+            ratelimit.RateLimitMiddleware(lambda request: None)
+
+    def test_stats_for_staff(self):
+        ratelimit.stats.record('new_post', False)
+        self.assertEqual(
+            self.client.get(reverse('profiling:throttling')).status_code,
+            302
+        )
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse('profiling:throttling'))
+        self.assertEqual(response.json()['throttled'], {'new_post': 1})
@@ -0,0 +1,110 @@
+import gzip
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Comment, Post, User
+from yatube.streaming import render_stream
+
+
+class StreamingTests(TestCase):
+    databases = {'default', 'archive'}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Maxim')
+        self.post = Post.objects.create(text='Streamed post', author=self.user)
+        Comment.objects.create(
+            post=self.post, author=self.user, text='Streamed comment'
+        )
+        self.client = Client()
+
+    def test_shell_is_sent_before_feed(self):
+        """Первый кусок — шапка и меню, блок content идёт следом."""
+        response = self.client.get(reverse('profile', args=['Maxim']))
+        self.assertTrue(response.streaming)
+        self.assertEqual(response.context['page'][0], self.post)
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        self.assertIn(b'</head>', chunks[0])
+        self.assertIn(b'<nav', chunks[0])
+        self.assertNotIn(b'Streamed post', chunks[0])
+        self.assertIn(b'Streamed post', b''.join(chunks))
+        self.assertTrue(b''.join(chunks).rstrip().endswith(b'</html>'))
+
+    def test_feed_is_read_after_head(self):
+        """Лента профиля читается, когда шапка уже отдана."""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile', args=['Maxim']))
+            chunks = iter(response.streaming_content)
+            next(chunks)
+            before_head = len(queries.captured_queries)
+            body = b''.join(chunks)
+        posts = [
+            index for index, query in enumerate(queries.captured_queries)
+            if 'FROM "posts_post"' in query['sql']
+        ]
+        self.assertTrue(posts)
+        self.assertGreaterEqual(min(posts), before_head)
+        self.assertIn(b'Streamed post', body)
+
+    def test_same_page_as_render(self):
+        """Потоковый рендер даёт ту же страницу, что и обычный."""
+        for i in range(12):
+            Post.objects.create(text=f'Post {i}', author=self.user)
+        url = reverse('profile', args=['Maxim'])
+        streamed = b''.join(self.client.get(url).streaming_content)
+        with self.settings(STREAM_RESPONSES=False):
+            self.assertEqual(self.client.get(url).content, streamed)
+
+    def test_comments_are_read_while_streaming(self):
+        url = reverse('post', args=['Maxim', self.post.pk])
+        with CaptureQueriesContext(connection) as view:
+            response = self.client.get(url)
+        self.assertFalse([
+            query for query in view.captured_queries
+            if 'posts_comment"' in query['sql']
+            and 'COUNT' not in query['sql']
+        ])
+        self.assertIn(
+            b'Streamed comment', b''.join(response.streaming_content)
+        )
+
+    def test_stream_is_compressed_in_chunks(self):
+        response = self.client.get(
+            reverse('profile', args=['Maxim']), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertIn(b'Streamed post', body)
+
+    def test_csrf_cookie_set_for_forms(self):
+        """Формы рендерятся после middleware: cookie ставится заранее."""
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse('post', args=['Maxim', self.post.pk])
+        )
+        self.assertIn('csrftoken', response.cookies)
+        content = b''.join(response.streaming_content).decode()
+        token = response.cookies['csrftoken'].value
+        self.assertIn('name="csrfmiddlewaretoken"', content)
+        self.assertNotIn('value=""', content)
+        self.assertTrue(token)
+
+    def test_cache_page_gets_whole_page(self):
+        """Промах cache_page рендерится целиком, чтобы попасть в кэш."""
+        request = RequestFactory().get('/')
+        request.user = self.user
+        request._cache_update_cache = True
+        response = render_stream(request, 'misc/404.html', {'path': '/'})
+        self.assertFalse(response.streaming)
+
+    @override_settings(STREAM_RESPONSES=False)
+    def test_can_be_disabled(self):
+        response = self.client.get(reverse('profile', args=['Maxim']))
+        self.assertFalse(response.streaming)
+        self.assertContains(response, 'Streamed post')
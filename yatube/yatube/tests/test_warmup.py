@@ -0,0 +1,39 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.wsgi import get_wsgi_application
+from django.test import TestCase, override_settings
+
+from posts.models import Post, User
+from yatube.warmup import warmup, wsgi_get
+
+
+@override_settings(WARMUP_URLS=['/', '/trending/'])
+class WarmupTests(TestCase):
+    databases = '__all__'
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='TestUser')
+        Post.objects.create(text='Test post', author=user)
+        self.application = get_wsgi_application()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_all_steps_run(self):
+        timings = warmup(self.application)
+        self.assertEqual(
+            set(timings),
+            {'urls', 'templates', 'translations', 'connections', 'requests'}
+        )
+        self.assertGreater(timings['templates'][0], 0)
+        self.assertEqual(
+            timings['connections'][0], len(settings.DATABASES)
+        )
+        self.assertEqual(timings['requests'][0], 2)
+
+    def test_requests_prime_page_cache(self):
+        self.assertEqual(wsgi_get(self.application, '/'), 200)
+        Post.objects.all().delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(wsgi_get(self.application, '/'), 200)
@@ -0,0 +1,139 @@
+import io
+import logging
+import os
+import sys
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.template.utils import get_app_template_dirs
+from django.urls import get_resolver
+from django.utils import translation
+
+logger = logging.getLogger(__name__)
+
+
+def load_urls():
+    # reverse_dict заполняется лениво при первом reverse().
+    resolver = get_resolver()
+    len(resolver.reverse_dict)
+    return len(resolver.url_patterns)
+
+
+def template_names(dirs):
+    for directory in dirs:
+        for root, _, files in os.walk(directory):
+            for name in files:
+                if name.endswith(('.html', '.txt')):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, directory)
+
+
+def compile_templates():
+    """Загружает все шаблоны, чтобы cached.Loader их запомнил."""
+    compiled = 0
+    for engine in engines.all():
+        dirs = list(getattr(engine, 'dirs', []))
+        dirs += list(get_app_template_dirs('templates'))
+        for name in set(template_names(dirs)):
+            try:
+                engine.get_template(name)
+            except Exception:
+                logger.debug('Template %s not compiled', name, exc_info=True)
+            else:
+                compiled += 1
+    return compiled
+
+
+def load_translations():
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Yatube')
+    return 1
+
+
+def open_connections():
+    for connection in connections.all():
+        connection.ensure_connection()
+    return len(connections.all())
+
+
+def warm_host():
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def wsgi_get(application, url):
+    """Выполняет GET через WSGI-приложение и возвращает статус."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': url,
+        'QUERY_STRING': '',
+        'SERVER_NAME': warm_host(),
+        'SERVER_PORT': '80',
+        'HTTP_HOST': warm_host(),
+        'HTTP_ACCEPT_ENCODING': 'br, gzip',
+        'REMOTE_ADDR': '127.0.0.1',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+        'wsgi.version': (1, 0),
+        'wsgi.multithread': False,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    statuses = []
+    response = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    try:
+        for _ in response:
+            pass
+    finally:
+        response.close()
+    return int(statuses[0].split()[0])
+
+
+def request_urls(application):
+    """Прогоняет WARMUP_URLS через приложение и наполняет кэши."""
+    urls = getattr(settings, 'WARMUP_URLS', [])
+    for url in urls:
+        wsgi_get(application, url)
+    return len(urls)
+
+
+def warmup(application=None):
+    """
+    Готовит процесс к первому запросу: URL-резолвер, шаблоны, переводы,
+    соединения с базами и кэши горячих страниц.
+
+    Возвращает {шаг: (сколько сделано, секунды)}. Вызывается из
+    yatube.wsgi до приёма трафика: в каждом воркере или, с preload,
+    один раз в мастере.
+    """
+    steps = [
+        ('urls', load_urls),
+        ('templates', compile_templates),
+        ('translations', load_translations),
+        ('connections', open_connections),
+    ]
+    if application is not None:
+        steps.append(('requests', lambda: request_urls(application)))
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            done = step()
+        except Exception:
+            logger.exception('Warmup step %s failed', name)
+            done = 0
+        timings[name] = (done, time.perf_counter() - started)
+    # С gunicorn --preload wsgi импортируется в мастере, и открытые
+    # здесь соединения унаследовали бы все воркеры после fork. Шаг
+    # connections только проверяет базы; воркер откроет свои сам.
+    connections.close_all()
+    logger.info('Warmup done: %s', timings)
+    return timings